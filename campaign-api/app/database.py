@@ -3,6 +3,7 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import run_in_threadpool
 from app.config import get_settings
 
 settings = get_settings()
@@ -11,8 +12,12 @@ settings = get_settings()
 engine = create_engine(
     settings.database_url,
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout_seconds,
+    pool_recycle=settings.db_pool_recycle_seconds,
+    # Compiled SQL cache; sized for the parametric router queries
+    query_cache_size=settings.db_query_cache_size,
 )
 
 # Session factory
@@ -22,10 +27,17 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
-def get_db():
-    """Dependency for database session."""
+async def get_db():
+    """
+    Dependency for database session.
+
+    Async so setup happens on the event loop rather than in a threadpool
+    hop: creating a Session does no I/O, and the connection is only checked
+    out on first use. Teardown does I/O (returning the connection to the
+    pool rolls it back), so close() runs in the threadpool.
+    """
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
+        await run_in_threadpool(db.close)
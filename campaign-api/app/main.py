@@ -1,8 +1,10 @@
 """USB Drop Campaign Manager - FastAPI Application."""
 
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from pathlib import Path
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 import logging
 
@@ -16,6 +18,16 @@ logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
+# Resolved once at import; middleware receives constants, not settings lookups
+ALLOW_ORIGINS = (
+    f"https://app.{settings.canary_domain}",
+    "http://localhost:5173",  # Vite dev server
+    "http://localhost:3000",
+)
+UPLOADS_DIR = Path("uploads").resolve()
+# Caddy serves this internal location when it sees X-Accel-Redirect
+UPLOADS_ACCEL_PREFIX = "/internal/uploads"
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -31,8 +43,31 @@ async def lifespan(app: FastAPI):
     from app.services.auth_service import create_initial_admin
     create_initial_admin()
 
+    # Start batched trigger writer for webhook bursts
+    from app.services.trigger_writer import trigger_writer
+    trigger_writer.start()
+
+    # Collect OpenAI document batches, including ones submitted before a restart
+    from app.services.document_batches import document_batch_poller
+    document_batch_poller.start()
+
+    # Listen for cache invalidations from other workers
+    from app.services.cache_events import cache_events
+    cache_events.start()
+
     yield
 
+    cache_events.stop()
+    await document_batch_poller.stop()
+    await trigger_writer.stop()
+
+    from app.services.canary_client import close_http_client as close_canary_client
+    from app.services.geo_service import close_http_client as close_geo_client
+    from app.services.content_generator import close_http_client as close_openai_client
+    await close_canary_client()
+    await close_geo_client()
+    await close_openai_client()
+
     # Shutdown
     logger.info("Shutting down USB Drop Campaign Manager...")
 
@@ -43,23 +78,31 @@ app = FastAPI(
     description="API for managing USB drop penetration testing campaigns with CanaryTokens",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[
-        f"https://app.{settings.canary_domain}",
-        "http://localhost:5173",  # Vite dev server
-        "http://localhost:3000",
-    ],
+    allow_origins=list(ALLOW_ORIGINS),
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count"],
 )
 
-# Static files for uploads
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# Static files for uploads. In debug the app serves them itself; otherwise
+# the reverse proxy sends the file and the worker only returns a header.
+if settings.debug:
+    if UPLOADS_DIR.is_dir():
+        app.mount("/uploads", StaticFiles(directory=UPLOADS_DIR), name="uploads")
+else:
+    @app.get("/uploads/{file_path:path}", include_in_schema=False)
+    async def serve_upload(file_path: str):
+        """Hand upload delivery off to the reverse proxy."""
+        if ".." in Path(file_path).parts:
+            raise HTTPException(status_code=404, detail="Not found")
+        return Response(headers={"X-Accel-Redirect": f"{UPLOADS_ACCEL_PREFIX}/{file_path}"})
 
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
@@ -8,6 +8,7 @@ from app.models.token import Token
 from app.models.deployment import Deployment
 from app.models.trigger import Trigger
 from app.models.content import GeneratedContent
+from app.models.document_batch import DocumentBatch
 
 __all__ = [
     "User",
@@ -19,4 +20,5 @@ __all__ = [
     "Deployment",
     "Trigger",
     "GeneratedContent",
+    "DocumentBatch",
 ]
@@ -1,12 +1,11 @@
 """Campaign model."""
 
-import uuid
-from datetime import datetime
-from sqlalchemy import Column, String, Text, Integer, Date, DateTime, Enum
+from sqlalchemy import Column, String, Text, Integer, Date, DateTime, Enum, Index, select, func, text
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, column_property
 import enum
 from app.database import Base
+from app.models.drive import Drive, DriveStatus
 
 
 class CampaignStatus(str, enum.Enum):
@@ -22,7 +21,7 @@ class Campaign(Base):
 
     __tablename__ = "campaigns"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     name = Column(String(255), nullable=False)
     client_name = Column(String(255), nullable=True)
     description = Column(Text, nullable=True)
@@ -30,32 +29,57 @@ class Campaign(Base):
     start_date = Column(Date, nullable=True)
     end_date = Column(Date, nullable=True)
     status = Column(
-        Enum(CampaignStatus),
+        Enum(
+            CampaignStatus,
+            name="campaign_status",
+            native_enum=False,
+            create_constraint=True,
+            length=20,
+            values_callable=lambda e: [m.value for m in e],
+        ),
         default=CampaignStatus.DRAFT,
         nullable=False
     )
     notes = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
-    drives = relationship("Drive", back_populates="campaign", cascade="all, delete-orphan")
-
-    @property
-    def drive_count(self) -> int:
-        """Get actual number of drives in campaign."""
-        return len(self.drives) if self.drives else 0
-
-    @property
-    def deployed_count(self) -> int:
-        """Get number of deployed drives."""
-        if not self.drives:
-            return 0
-        return sum(1 for d in self.drives if d.status in ["deployed", "triggered", "recovered"])
-
-    @property
-    def triggered_count(self) -> int:
-        """Get number of triggered drives."""
-        if not self.drives:
-            return 0
-        return sum(1 for d in self.drives if d.status in ["triggered"])
+    drives = relationship(
+        "Drive", back_populates="campaign", cascade="all, delete-orphan", passive_deletes=True
+    )
+
+    __table_args__ = (
+        # list_campaigns: filter by status, newest first
+        Index("ix_campaigns_status_created", "status", created_at.desc()),
+    )
+
+    # Drive counts, computed in SQL. Deferred as a group so they are only
+    # fetched when a response needs them (see undefer_group("counts")).
+    drive_count = column_property(
+        select(func.count(Drive.id))
+        .where(Drive.campaign_id == id)
+        .correlate_except(Drive)
+        .scalar_subquery(),
+        deferred=True,
+        group="counts",
+    )
+    deployed_count = column_property(
+        select(func.count(Drive.id))
+        .where(
+            Drive.campaign_id == id,
+            Drive.status.in_([DriveStatus.DEPLOYED, DriveStatus.TRIGGERED, DriveStatus.RECOVERED]),
+        )
+        .correlate_except(Drive)
+        .scalar_subquery(),
+        deferred=True,
+        group="counts",
+    )
+    triggered_count = column_property(
+        select(func.count(Drive.id))
+        .where(Drive.campaign_id == id, Drive.status == DriveStatus.TRIGGERED)
+        .correlate_except(Drive)
+        .scalar_subquery(),
+        deferred=True,
+        group="counts",
+    )
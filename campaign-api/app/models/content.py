@@ -1,8 +1,6 @@
 """Generated Content model - AI-created files."""
 
-import uuid
-from datetime import datetime
-from sqlalchemy import Column, String, Text, DateTime, Integer, ForeignKey
+from sqlalchemy import Column, String, Text, DateTime, Integer, ForeignKey, text, func
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -13,8 +11,8 @@ class GeneratedContent(Base):
 
     __tablename__ = "generated_content"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    profile_id = Column(UUID(as_uuid=True), ForeignKey("profiles.id"), nullable=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    profile_id = Column(UUID(as_uuid=True), ForeignKey("profiles.id", ondelete="SET NULL"), nullable=True)
 
     # Content type
     content_type = Column(String(50), nullable=False)  # document, image, pdf, text
@@ -29,15 +27,15 @@ class GeneratedContent(Base):
     file_size_bytes = Column(Integer, nullable=True)
     mime_type = Column(String(100), nullable=True)
 
-    # Metadata
-    metadata = Column(JSONB, default=dict)
+    # Metadata (attribute renamed; `metadata` is reserved on declarative Base)
+    content_metadata = Column("metadata", JSONB, default=dict)
 
     # Generation stats
     tokens_used = Column(Integer, nullable=True)
     generation_time_ms = Column(Integer, nullable=True)
 
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     profile = relationship("Profile", back_populates="generated_content")
@@ -1,8 +1,6 @@
 """Deployment model - where USB drives are dropped."""
 
-import uuid
-from datetime import datetime
-from sqlalchemy import Column, String, Text, DateTime, Numeric, ForeignKey
+from sqlalchemy import Column, String, Text, DateTime, Numeric, ForeignKey, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -13,8 +11,8 @@ class Deployment(Base):
 
     __tablename__ = "deployments"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    drive_id = Column(UUID(as_uuid=True), ForeignKey("drives.id"), nullable=False, unique=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    drive_id = Column(UUID(as_uuid=True), ForeignKey("drives.id", ondelete="CASCADE"), nullable=False, unique=True)
 
     # GPS coordinates
     latitude = Column(Numeric(10, 8), nullable=True)
@@ -40,8 +38,8 @@ class Deployment(Base):
     weather_conditions = Column(String(100), nullable=True)
 
     # Timestamps
-    deployed_at = Column(DateTime, default=datetime.utcnow)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    deployed_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     drive = relationship("Drive", back_populates="deployment")
@@ -0,0 +1,38 @@
+"""Document batch model - OpenAI Batch API jobs awaiting results."""
+
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, func, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from app.database import Base
+
+
+class DocumentBatch(Base):
+    """A profile's documents submitted to the OpenAI Batch API.
+
+    Rows outlive the worker that submitted them: the batch poller picks up
+    pending rows on startup and stores the documents when the batch ends.
+    """
+
+    __tablename__ = "document_batches"
+
+    # OpenAI batch id
+    id = Column(String(100), primary_key=True)
+    profile_id = Column(UUID(as_uuid=True), ForeignKey("profiles.id", ondelete="SET NULL"), nullable=True)
+
+    # The submitted jobs ("prompt", "type", "filename"), in custom_id order
+    jobs = Column(JSONB, nullable=False)
+
+    # pending, completed, failed, expired, cancelled
+    status = Column(String(20), nullable=False, default="pending")
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # The poller only reads unfinished batches
+        Index(
+            "ix_document_batches_pending",
+            created_at,
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
@@ -1,13 +1,14 @@
 """Drive model - Individual USB drives."""
 
-import uuid
-import secrets
-from datetime import datetime
-from sqlalchemy import Column, String, Text, DateTime, Enum, ForeignKey
+from sqlalchemy import (
+    DDL, Column, String, Text, DateTime, Enum, ForeignKey, Index, Sequence, event, select, func, text,
+)
 from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, column_property
 import enum
 from app.database import Base
+from app.models.token import Token
+from app.models.trigger import Trigger
 
 
 class DriveStatus(str, enum.Enum):
@@ -19,10 +20,23 @@ class DriveStatus(str, enum.Enum):
     RECOVERED = "recovered"  # Drive was recovered/collected
 
 
-def generate_drive_code() -> str:
-    """Generate a unique drive code like USB-A1B2C3."""
-    suffix = secrets.token_hex(3).upper()
-    return f"USB-{suffix}"
+# Drive codes like USB-2708B4A are allocated by Postgres from a sequence,
+# so they are unique without a retry loop on the unique constraint. The
+# sequence value goes through a fixed 28-bit permutation (odd multiplies and
+# xor-shifts, each invertible) so the codes written on drives don't read as
+# a running count. The permutation is not secret; the code is only a label
+# and the by-code lookups require authentication. Seven hex digits keep new
+# codes disjoint from the older six-digit random ones.
+drive_code_seq = Sequence("drive_code_seq", maxvalue=0xFFFFFFF, metadata=Base.metadata)
+
+DRIVE_CODE_FUNCTION = DDL("""
+CREATE OR REPLACE FUNCTION drive_code(n bigint) RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT 'USB-' || upper(lpad(to_hex(x # (x >> 13)), 7, '0'))
+    FROM (SELECT ((y # (y >> 14)) * 98384533) & 268435455 AS x
+          FROM (SELECT (n * 165902235) & 268435455 AS y) s) t
+$$
+""")
 
 
 class Drive(Base):
@@ -30,15 +44,31 @@ class Drive(Base):
 
     __tablename__ = "drives"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    campaign_id = Column(UUID(as_uuid=True), ForeignKey("campaigns.id"), nullable=False)
-    profile_id = Column(UUID(as_uuid=True), ForeignKey("profiles.id"), nullable=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    campaign_id = Column(UUID(as_uuid=True), ForeignKey("campaigns.id", ondelete="CASCADE"), nullable=False)
+    profile_id = Column(UUID(as_uuid=True), ForeignKey("profiles.id", ondelete="SET NULL"), nullable=True)
 
     # Unique identifier
-    unique_code = Column(String(20), unique=True, nullable=False, default=generate_drive_code)
+    unique_code = Column(
+        String(20),
+        unique=True,
+        nullable=False,
+        server_default=text("drive_code(nextval('drive_code_seq'))"),
+    )
 
     # Status tracking
-    status = Column(Enum(DriveStatus), default=DriveStatus.CREATED, nullable=False)
+    status = Column(
+        Enum(
+            DriveStatus,
+            name="drive_status",
+            native_enum=False,
+            create_constraint=True,
+            length=20,
+            values_callable=lambda e: [m.value for m in e],
+        ),
+        default=DriveStatus.CREATED,
+        nullable=False,
+    )
 
     # Physical drive info
     label = Column(String(100), nullable=True)  # What's written on the drive
@@ -52,24 +82,55 @@ class Drive(Base):
     notes = Column(Text, nullable=True)
 
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     prepared_at = Column(DateTime, nullable=True)
     deployed_at = Column(DateTime, nullable=True)
     triggered_at = Column(DateTime, nullable=True)
     recovered_at = Column(DateTime, nullable=True)
 
     # Relationships
-    campaign = relationship("Campaign", back_populates="drives")
+    # Parent lookups must be eager-loaded (or already in the session);
+    # collections stay lazy, and deletes cascade in the database.
+    campaign = relationship("Campaign", back_populates="drives", lazy="raise_on_sql")
     profile = relationship("Profile", back_populates="drives")
-    tokens = relationship("Token", back_populates="drive", cascade="all, delete-orphan")
-    deployment = relationship("Deployment", back_populates="drive", uselist=False)
-
-    @property
-    def trigger_count(self) -> int:
-        """Get total number of token triggers for this drive."""
-        if not self.tokens:
-            return 0
-        return sum(len(t.triggers) for t in self.tokens if t.triggers)
+    tokens = relationship(
+        "Token", back_populates="drive", cascade="all, delete-orphan", passive_deletes=True
+    )
+    deployment = relationship(
+        "Deployment", back_populates="drive", uselist=False,
+        cascade="all, delete-orphan", passive_deletes=True,
+    )
+
+    __table_args__ = (
+        # list_drives: filter by campaign/status, newest first
+        Index(
+            "ix_drives_campaign_status_created",
+            "campaign_id",
+            "status",
+            created_at.desc(),
+        ),
+        # Drives counted as deployed by the campaign aggregates
+        Index(
+            "ix_drives_active",
+            "campaign_id",
+            postgresql_where=text("status IN ('deployed', 'triggered', 'recovered')"),
+        ),
+    )
+
+    # Total token triggers for this drive, computed in SQL
+    trigger_count = column_property(
+        select(func.count(Trigger.id))
+        .join(Token, Trigger.token_id == Token.id)
+        .where(Token.drive_id == id)
+        .correlate_except(Trigger, Token)
+        .scalar_subquery(),
+        deferred=True,
+        group="counts",
+    )
+
+
+# The unique_code default calls drive_code(), so it must exist first
+event.listen(Drive.__table__, "before_create", DRIVE_CODE_FUNCTION)
 
 
 # Example files_manifest JSONB:
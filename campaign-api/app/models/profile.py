@@ -1,8 +1,6 @@
 """Profile model - USB drive templates."""
 
-import uuid
-from datetime import datetime
-from sqlalchemy import Column, String, Text, DateTime
+from sqlalchemy import Column, String, Text, Boolean, DateTime, func, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -13,7 +11,7 @@ class Profile(Base):
 
     __tablename__ = "profiles"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     name = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
 
@@ -30,13 +28,15 @@ class Profile(Base):
     label_suggestions = Column(ARRAY(String), default=list)
 
     # Metadata
-    is_system = Column(String(10), default="false")  # Built-in vs user-created
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    is_system = Column(Boolean, nullable=False, server_default=text("false"))  # Built-in vs user-created
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
-    drives = relationship("Drive", back_populates="profile")
-    generated_content = relationship("GeneratedContent", back_populates="profile")
+    drives = relationship("Drive", back_populates="profile", passive_deletes=True)
+    generated_content = relationship(
+        "GeneratedContent", back_populates="profile", passive_deletes=True
+    )
 
 
 # Example file_structure JSONB:
@@ -1,8 +1,6 @@
 """Token model - CanaryTokens linked to drives."""
 
-import uuid
-from datetime import datetime
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey
+from sqlalchemy import DDL, Column, String, Text, DateTime, ForeignKey, Index, event, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -13,8 +11,10 @@ class Token(Base):
 
     __tablename__ = "tokens"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    drive_id = Column(UUID(as_uuid=True), ForeignKey("drives.id"), nullable=False)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    drive_id = Column(UUID(as_uuid=True), ForeignKey("drives.id", ondelete="CASCADE"), nullable=False, index=True)
+    # Denormalized from drives.campaign_id so campaign filters skip the drive join
+    campaign_id = Column(UUID(as_uuid=True), ForeignKey("campaigns.id", ondelete="CASCADE"), nullable=False, index=True)
 
     # CanaryTokens API data
     canary_token_id = Column(String(255), nullable=False, unique=True, index=True)
@@ -35,13 +35,26 @@ class Token(Base):
     aws_secret_access_key = Column(String(100), nullable=True)
 
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     first_triggered_at = Column(DateTime, nullable=True)
     last_triggered_at = Column(DateTime, nullable=True)
 
     # Relationships
-    drive = relationship("Drive", back_populates="tokens")
-    triggers = relationship("Trigger", back_populates="token", cascade="all, delete-orphan")
+    drive = relationship("Drive", back_populates="tokens", lazy="raise_on_sql")
+    triggers = relationship(
+        "Trigger", back_populates="token", cascade="all, delete-orphan", passive_deletes=True
+    )
+
+    __table_args__ = (
+        # Webhook fallback: substring match on the memo when the token ID
+        # in the alert is not recognised
+        Index(
+            "ix_tokens_memo_trgm",
+            memo,
+            postgresql_using="gin",
+            postgresql_ops={"memo": "gin_trgm_ops"},
+        ),
+    )
 
     @property
     def trigger_count(self) -> int:
@@ -52,3 +65,7 @@ class Token(Base):
     def is_triggered(self) -> bool:
         """Check if token has been triggered at least once."""
         return self.first_triggered_at is not None
+
+
+# Trigram operator class for ix_tokens_memo_trgm
+event.listen(Token.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
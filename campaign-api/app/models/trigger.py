@@ -1,8 +1,6 @@
 """Trigger model - Token activation events."""
 
-import uuid
-from datetime import datetime
-from sqlalchemy import Column, String, Text, DateTime, Numeric, ForeignKey
+from sqlalchemy import Column, String, Text, DateTime, Numeric, ForeignKey, Index, text, func
 from sqlalchemy.dialects.postgresql import UUID, JSONB, INET
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -13,8 +11,8 @@ class Trigger(Base):
 
     __tablename__ = "triggers"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    token_id = Column(UUID(as_uuid=True), ForeignKey("tokens.id"), nullable=False)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    token_id = Column(UUID(as_uuid=True), ForeignKey("tokens.id", ondelete="CASCADE"), nullable=False)
 
     # Source information
     source_ip = Column(INET, nullable=True)
@@ -37,11 +35,24 @@ class Trigger(Base):
     raw_payload = Column(JSONB, nullable=True)
 
     # Timestamps
-    triggered_at = Column(DateTime, default=datetime.utcnow)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    triggered_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
-    token = relationship("Token", back_populates="triggers")
+    token = relationship("Token", back_populates="triggers", lazy="raise_on_sql")
+
+    __table_args__ = (
+        # Time-window filters with ORDER BY triggered_at DESC LIMIT N
+        Index("ix_triggers_triggered_at_desc", triggered_at.desc(), token_id),
+        Index("ix_triggers_token_id", token_id),
+        # Map view only reads geolocated triggers
+        Index(
+            "ix_triggers_geo",
+            geo_latitude,
+            geo_longitude,
+            postgresql_where=text("geo_latitude IS NOT NULL"),
+        ),
+    )
 
     @property
     def coordinates(self) -> tuple | None:
@@ -2,11 +2,16 @@
 
 from datetime import datetime, timedelta
 from typing import Optional, List
-from fastapi import APIRouter, Depends, Query
-from pydantic import BaseModel
-from sqlalchemy.orm import Session, joinedload
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import func, case, distinct, literal, select, lambda_stmt
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session
 import uuid
 
+from app.config import get_settings
 from app.database import get_db
 from app.models.trigger import Trigger
 from app.models.token import Token
@@ -16,6 +21,19 @@ from app.models.user import User
 from app.routers.auth import get_current_user
 
 router = APIRouter()
+settings = get_settings()
+
+# Alert stats keyed by campaign_id (None = all campaigns). Dashboards poll
+# this endpoint; new triggers clear it via invalidate_alert_stats().
+_stats_cache: TTLCache = TTLCache(maxsize=256, ttl=settings.alert_stats_cache_ttl_seconds)
+
+# Rows fetched per round-trip when reading map points
+MAP_STREAM_BATCH_SIZE = 1000
+
+MAP_LABEL_PREFIXES = {
+    "deployment": "Dropped",
+    "trigger": "Triggered",
+}
 
 
 class TriggerDetail(BaseModel):
@@ -37,6 +55,9 @@ class TriggerDetail(BaseModel):
         from_attributes = True
 
 
+_TRIGGER_DETAIL_LIST_ADAPTER = TypeAdapter(List[TriggerDetail])
+
+
 class MapPoint(BaseModel):
     id: uuid.UUID
     type: str  # "deployment" or "trigger"
@@ -56,7 +77,59 @@ class AlertStats(BaseModel):
     unique_drives: int
 
 
-@router.get("", response_model=List[TriggerDetail])
+def invalidate_alert_stats():
+    """Drop cached alert stats after triggers change."""
+    _stats_cache.clear()
+
+
+def _trigger_detail_stmt():
+    """
+    Select only the columns needed to build a TriggerDetail.
+
+    Built as a lambda statement so the compiled SQL is cached; callers
+    append their filters with `stmt += lambda s: ...`.
+    """
+    return lambda_stmt(lambda: select(
+        Trigger.id,
+        Trigger.triggered_at,
+        Trigger.source_ip,
+        Trigger.user_agent,
+        Trigger.geo_city,
+        Trigger.geo_country,
+        Trigger.geo_latitude,
+        Trigger.geo_longitude,
+        Token.id.label("token_id"),
+        Token.token_type,
+        Token.filename,
+        Drive.unique_code,
+        Campaign.name,
+    ).select_from(Trigger).join(Token).join(Drive).join(Campaign))
+
+
+def _to_trigger_detail(row) -> TriggerDetail:
+    """
+    Build a TriggerDetail from a _trigger_detail_stmt row.
+
+    The row is already typed by the database, so validation is skipped.
+    """
+    return TriggerDetail.model_construct(
+        id=row.id,
+        token_id=row.token_id,
+        token_type=row.token_type,
+        token_filename=row.filename,
+        drive_code=row.unique_code,
+        campaign_name=row.name,
+        source_ip=str(row.source_ip) if row.source_ip else None,
+        user_agent=row.user_agent,
+        geo_city=row.geo_city,
+        geo_country=row.geo_country,
+        geo_latitude=float(row.geo_latitude) if row.geo_latitude else None,
+        geo_longitude=float(row.geo_longitude) if row.geo_longitude else None,
+        triggered_at=row.triggered_at,
+    )
+
+
+@router.get("", response_model=List[TriggerDetail], response_class=ORJSONResponse)
 async def list_alerts(
     campaign_id: Optional[uuid.UUID] = None,
     drive_id: Optional[uuid.UUID] = None,
@@ -69,43 +142,25 @@ async def list_alerts(
     """List all trigger alerts."""
     cutoff = datetime.utcnow() - timedelta(days=days)
 
-    query = db.query(Trigger).join(Token).join(Drive).join(Campaign)
-    query = query.filter(Trigger.triggered_at >= cutoff)
+    stmt = _trigger_detail_stmt()
+    stmt += lambda s: s.where(Trigger.triggered_at >= cutoff)
 
     if campaign_id:
-        query = query.filter(Campaign.id == campaign_id)
+        stmt += lambda s: s.where(Campaign.id == campaign_id)
     if drive_id:
-        query = query.filter(Drive.id == drive_id)
-
-    query = query.order_by(Trigger.triggered_at.desc())
-    triggers = query.offset(skip).limit(limit).all()
-
-    results = []
-    for trigger in triggers:
-        token = trigger.token
-        drive = token.drive
-        campaign = drive.campaign
-
-        results.append(TriggerDetail(
-            id=trigger.id,
-            token_id=token.id,
-            token_type=token.token_type,
-            token_filename=token.filename,
-            drive_code=drive.unique_code,
-            campaign_name=campaign.name,
-            source_ip=str(trigger.source_ip) if trigger.source_ip else None,
-            user_agent=trigger.user_agent,
-            geo_city=trigger.geo_city,
-            geo_country=trigger.geo_country,
-            geo_latitude=float(trigger.geo_latitude) if trigger.geo_latitude else None,
-            geo_longitude=float(trigger.geo_longitude) if trigger.geo_longitude else None,
-            triggered_at=trigger.triggered_at,
-        ))
-
-    return results
-
-
-@router.get("/recent", response_model=List[TriggerDetail])
+        stmt += lambda s: s.where(Drive.id == drive_id)
+
+    stmt += lambda s: s.order_by(Trigger.triggered_at.desc()).offset(skip).limit(limit)
+    rows = db.execute(stmt).all()
+
+    # Serialize in one pydantic-core pass, bypassing jsonable_encoder
+    return Response(
+        _TRIGGER_DETAIL_LIST_ADAPTER.dump_json([_to_trigger_detail(row) for row in rows]),
+        media_type="application/json",
+    )
+
+
+@router.get("/recent", response_model=List[TriggerDetail], response_class=ORJSONResponse)
 async def recent_alerts(
     hours: int = Query(24, ge=1, le=168),
     current_user: User = Depends(get_current_user),
@@ -114,33 +169,16 @@ async def recent_alerts(
     """Get recent alerts (last N hours)."""
     cutoff = datetime.utcnow() - timedelta(hours=hours)
 
-    triggers = db.query(Trigger).filter(
+    stmt = _trigger_detail_stmt()
+    stmt += lambda s: s.where(
         Trigger.triggered_at >= cutoff
-    ).order_by(Trigger.triggered_at.desc()).limit(100).all()
-
-    results = []
-    for trigger in triggers:
-        token = trigger.token
-        drive = token.drive
-        campaign = drive.campaign
-
-        results.append(TriggerDetail(
-            id=trigger.id,
-            token_id=token.id,
-            token_type=token.token_type,
-            token_filename=token.filename,
-            drive_code=drive.unique_code,
-            campaign_name=campaign.name,
-            source_ip=str(trigger.source_ip) if trigger.source_ip else None,
-            user_agent=trigger.user_agent,
-            geo_city=trigger.geo_city,
-            geo_country=trigger.geo_country,
-            geo_latitude=float(trigger.geo_latitude) if trigger.geo_latitude else None,
-            geo_longitude=float(trigger.geo_longitude) if trigger.geo_longitude else None,
-            triggered_at=trigger.triggered_at,
-        ))
-
-    return results
+    ).order_by(Trigger.triggered_at.desc()).limit(100)
+    rows = db.execute(stmt).all()
+
+    return Response(
+        _TRIGGER_DETAIL_LIST_ADAPTER.dump_json([_to_trigger_detail(row) for row in rows]),
+        media_type="application/json",
+    )
 
 
 @router.get("/stats", response_model=AlertStats)
@@ -150,43 +188,39 @@ async def alert_stats(
     db: Session = Depends(get_db)
 ):
     """Get alert statistics."""
-    from app.models.deployment import Deployment
-
-    query = db.query(Trigger).join(Token).join(Drive)
-    if campaign_id:
-        query = query.filter(Drive.campaign_id == campaign_id)
-
-    all_triggers = query.all()
+    cached = _stats_cache.get(campaign_id)
+    if cached is not None:
+        return cached
 
     now = datetime.utcnow()
     today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
     week_start = today_start - timedelta(days=7)
 
-    unique_ips = set()
-    unique_drives = set()
-    today_count = 0
-    week_count = 0
-
-    for trigger in all_triggers:
-        if trigger.source_ip:
-            unique_ips.add(str(trigger.source_ip))
-        unique_drives.add(trigger.token.drive_id)
+    # Aggregate in a single query instead of loading every trigger row
+    query = db.query(
+        func.count(Trigger.id),
+        func.coalesce(func.sum(case((Trigger.triggered_at >= today_start, 1), else_=0)), 0),
+        func.coalesce(func.sum(case((Trigger.triggered_at >= week_start, 1), else_=0)), 0),
+        func.count(distinct(Trigger.source_ip)),
+        func.count(distinct(Token.drive_id)),
+    ).select_from(Trigger).join(Token)
+    if campaign_id:
+        query = query.filter(Token.campaign_id == campaign_id)
 
-        if trigger.triggered_at >= today_start:
-            today_count += 1
-        if trigger.triggered_at >= week_start:
-            week_count += 1
+    total, today_count, week_count, unique_ips, unique_drives = query.one()
 
-    return AlertStats(
-        total_triggers=len(all_triggers),
+    stats = AlertStats(
+        total_triggers=total,
         triggers_today=today_count,
         triggers_week=week_count,
-        unique_ips=len(unique_ips),
-        unique_drives=len(unique_drives),
+        unique_ips=unique_ips,
+        unique_drives=unique_drives,
     )
+    _stats_cache[campaign_id] = stats
+    return stats
 
 
-@router.get("/map", response_model=List[MapPoint])
+@router.get("/map", response_model=List[MapPoint], response_class=ORJSONResponse)
 async def map_data(
     campaign_id: Optional[uuid.UUID] = None,
     include_deployments: bool = True,
@@ -197,61 +231,77 @@ async def map_data(
     """Get data for map visualization."""
     from app.models.deployment import Deployment
 
-    points = []
+    # Both point kinds share one row shape so they can be fetched in a
+    # single UNION ALL; Postgres builds the details object.
+    queries = []
 
-    # Get deployments
     if include_deployments:
-        dep_query = db.query(Deployment).join(Drive)
+        dep_query = db.query(
+            literal("deployment").label("type"),
+            Deployment.id.label("id"),
+            Deployment.latitude.label("latitude"),
+            Deployment.longitude.label("longitude"),
+            Drive.unique_code.label("drive_code"),
+            Deployment.deployed_at.label("timestamp"),
+            func.jsonb_build_object(
+                "location_name", Deployment.location_name,
+                "location_type", Deployment.location_type,
+                "deployed_by", Deployment.deployed_by,
+                type_=JSONB,
+            ).label("details"),
+        ).join(Drive)
         if campaign_id:
             dep_query = dep_query.filter(Drive.campaign_id == campaign_id)
-        deployments = dep_query.all()
-
-        for dep in deployments:
-            if dep.latitude and dep.longitude:
-                drive = dep.drive
-                points.append(MapPoint(
-                    id=dep.id,
-                    type="deployment",
-                    latitude=float(dep.latitude),
-                    longitude=float(dep.longitude),
-                    label=f"Dropped: {drive.unique_code}",
-                    drive_code=drive.unique_code,
-                    timestamp=dep.deployed_at,
-                    details={
-                        "location_name": dep.location_name,
-                        "location_type": dep.location_type,
-                        "deployed_by": dep.deployed_by,
-                    }
-                ))
-
-    # Get triggers with geo data
+        dep_query = dep_query.filter(
+            Deployment.latitude.isnot(None),
+            Deployment.longitude.isnot(None)
+        )
+        queries.append(dep_query)
+
     if include_triggers:
-        trig_query = db.query(Trigger).join(Token).join(Drive)
+        trig_query = db.query(
+            literal("trigger").label("type"),
+            Trigger.id.label("id"),
+            Trigger.geo_latitude.label("latitude"),
+            Trigger.geo_longitude.label("longitude"),
+            Drive.unique_code.label("drive_code"),
+            Trigger.triggered_at.label("timestamp"),
+            func.jsonb_build_object(
+                "token_type", Token.token_type,
+                "source_ip", Trigger.source_ip,
+                "city", Trigger.geo_city,
+                "country", Trigger.geo_country,
+                type_=JSONB,
+            ).label("details"),
+        ).select_from(Trigger).join(Token).join(Drive)
         if campaign_id:
-            trig_query = trig_query.filter(Drive.campaign_id == campaign_id)
+            trig_query = trig_query.filter(Token.campaign_id == campaign_id)
         trig_query = trig_query.filter(
             Trigger.geo_latitude.isnot(None),
             Trigger.geo_longitude.isnot(None)
         )
-        triggers = trig_query.all()
-
-        for trigger in triggers:
-            token = trigger.token
-            drive = token.drive
-            points.append(MapPoint(
-                id=trigger.id,
-                type="trigger",
-                latitude=float(trigger.geo_latitude),
-                longitude=float(trigger.geo_longitude),
-                label=f"Triggered: {drive.unique_code}",
-                drive_code=drive.unique_code,
-                timestamp=trigger.triggered_at,
-                details={
-                    "token_type": token.token_type,
-                    "source_ip": str(trigger.source_ip) if trigger.source_ip else None,
-                    "city": trigger.geo_city,
-                    "country": trigger.geo_country,
-                }
-            ))
-
-    return points
+        queries.append(trig_query)
+
+    if not queries:
+        return ORJSONResponse([])
+
+    query = queries[0].union_all(*queries[1:])
+
+    # Rows go straight into MapPoint-shaped dicts, the only copy kept;
+    # yield_per bounds what the driver buffers, and orjson encodes the
+    # UUIDs and datetimes itself
+    points = [
+        {
+            "id": row.id,
+            "type": row.type,
+            "latitude": float(row.latitude),
+            "longitude": float(row.longitude),
+            "label": f"{MAP_LABEL_PREFIXES[row.type]}: {row.drive_code}",
+            "drive_code": row.drive_code,
+            "timestamp": row.timestamp,
+            "details": row.details,
+        }
+        for row in query.yield_per(MAP_STREAM_BATCH_SIZE)
+    ]
+
+    return ORJSONResponse(points)
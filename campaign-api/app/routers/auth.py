@@ -2,7 +2,7 @@
 
 from datetime import datetime
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from pydantic import BaseModel, EmailStr
 from sqlalchemy.orm import Session
@@ -10,14 +10,18 @@ import uuid
 
 from app.database import get_db
 from app.models.user import User, APIKey
+from app.services.cache_events import publish as publish_cache_event
 from app.services.auth_service import (
     authenticate_user,
     create_access_token,
     create_refresh_token,
     decode_token,
+    forget_api_key,
     get_password_hash,
+    record_login,
     generate_api_key,
     verify_api_key,
+    verify_api_key_user_id,
 )
 
 router = APIRouter()
@@ -62,8 +66,10 @@ class RefreshRequest(BaseModel):
     refresh_token: str
 
 
-# Dependency to get current user
-async def get_current_user(
+# Dependency to get current user. Plain def so FastAPI runs its blocking
+# queries in the threadpool instead of on the event loop.
+def get_current_user(
+    background_tasks: BackgroundTasks,
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ) -> User:
@@ -76,7 +82,7 @@ async def get_current_user(
 
     # Check if it's an API key
     if token.startswith("usbdrop_"):
-        user = verify_api_key(db, token)
+        user = verify_api_key(db, token, background_tasks)
         if user:
             return user
         raise credentials_exception
@@ -103,6 +109,35 @@ async def get_current_user(
     return user
 
 
+def get_current_user_id(
+    background_tasks: BackgroundTasks,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> uuid.UUID:
+    """
+    Get the authenticated user's ID without loading the user.
+
+    Access tokens carry the user ID in their "uid" claim, so with the decode
+    cache this needs no database work. Tokens issued before that claim
+    existed fall back to get_current_user.
+    """
+    if token.startswith("usbdrop_"):
+        user_id = verify_api_key_user_id(db, token, background_tasks)
+        if user_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        return user_id
+
+    payload = decode_token(token)
+    if payload and payload.get("type") == "access" and payload.get("uid"):
+        return uuid.UUID(payload["uid"])
+
+    return get_current_user(background_tasks, token, db).id
+
+
 async def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
     """Require admin privileges."""
     if not current_user.is_admin:
@@ -115,6 +150,7 @@ async def get_current_admin(current_user: User = Depends(get_current_user)) -> U
 
 @router.post("/login", response_model=TokenResponse)
 async def login(
+    background_tasks: BackgroundTasks,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
@@ -127,12 +163,11 @@ async def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Update last login
-    user.last_login = datetime.utcnow()
-    db.commit()
+    # Update last login after the response is sent
+    background_tasks.add_task(record_login, user.id)
 
     # Create tokens
-    access_token = create_access_token(data={"sub": user.username})
+    access_token = create_access_token(data={"sub": user.username, "uid": str(user.id)})
     refresh_token = create_refresh_token(data={"sub": user.username})
 
     return TokenResponse(
@@ -163,7 +198,7 @@ async def refresh_token(
         )
 
     # Create new tokens
-    access_token = create_access_token(data={"sub": user.username})
+    access_token = create_access_token(data={"sub": user.username, "uid": str(user.id)})
     new_refresh_token = create_refresh_token(data={"sub": user.username})
 
     return TokenResponse(
@@ -234,6 +269,9 @@ async def delete_api_key(
         raise HTTPException(status_code=404, detail="API key not found")
 
     key.is_active = False
+    # Other workers evict the key when this commits; this one does it now
+    publish_cache_event(db, "api_key", str(key.id))
     db.commit()
+    forget_api_key(key.id)
 
     return {"message": "API key deleted"}
@@ -2,15 +2,15 @@
 
 from datetime import datetime, date
 from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, Query
-from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import delete, distinct, exists, func, update
+from sqlalchemy.orm import Session, undefer_group
 import uuid
 
 from app.database import get_db
 from app.models.campaign import Campaign, CampaignStatus
-from app.models.user import User
-from app.routers.auth import get_current_user
+from app.routers.auth import get_current_user_id
 
 router = APIRouter()
 
@@ -57,6 +57,10 @@ class CampaignResponse(BaseModel):
         from_attributes = True
 
 
+# Validate and serialize list responses entirely in pydantic-core
+_CAMPAIGN_LIST_ADAPTER = TypeAdapter(List[CampaignResponse])
+
+
 class CampaignStats(BaseModel):
     total_drives: int
     created: int
@@ -73,22 +77,37 @@ async def list_campaigns(
     status: Optional[CampaignStatus] = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    current_user: User = Depends(get_current_user),
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
-    """List all campaigns."""
-    query = db.query(Campaign)
+    """List all campaigns. The unpaginated total is returned in X-Total-Count."""
+    # The window count comes back on every row of the page, so the total
+    # costs no extra round-trip
+    query = db.query(Campaign, func.count().over()).options(undefer_group("counts"))
     if status:
         query = query.filter(Campaign.status == status)
     query = query.order_by(Campaign.created_at.desc())
-    campaigns = query.offset(skip).limit(limit).all()
-    return campaigns
+    rows = query.offset(skip).limit(limit).all()
+
+    if rows:
+        total = rows[0][1]
+    elif skip:
+        total = query.order_by(None).with_entities(func.count(Campaign.id)).scalar()
+    else:
+        total = 0
+
+    campaigns = _CAMPAIGN_LIST_ADAPTER.validate_python([c for c, _ in rows], from_attributes=True)
+    return Response(
+        _CAMPAIGN_LIST_ADAPTER.dump_json(campaigns),
+        media_type="application/json",
+        headers={"X-Total-Count": str(total)},
+    )
 
 
 @router.post("", response_model=CampaignResponse)
 async def create_campaign(
     campaign_data: CampaignCreate,
-    current_user: User = Depends(get_current_user),
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """Create a new campaign."""
@@ -102,11 +121,11 @@ async def create_campaign(
 @router.get("/{campaign_id}", response_model=CampaignResponse)
 async def get_campaign(
     campaign_id: uuid.UUID,
-    current_user: User = Depends(get_current_user),
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """Get campaign by ID."""
-    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    campaign = db.get(Campaign, campaign_id, options=[undefer_group("counts")])
     if not campaign:
         raise HTTPException(status_code=404, detail="Campaign not found")
     return campaign
@@ -116,35 +135,36 @@ async def get_campaign(
 async def update_campaign(
     campaign_id: uuid.UUID,
     campaign_data: CampaignUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """Update a campaign."""
-    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    update_data = campaign_data.model_dump(exclude_unset=True)
+    if update_data:
+        # Write without loading the row first; the response is read back below
+        db.execute(update(Campaign).where(Campaign.id == campaign_id).values(**update_data))
+    campaign = db.get(Campaign, campaign_id, options=[undefer_group("counts")])
     if not campaign:
         raise HTTPException(status_code=404, detail="Campaign not found")
 
-    update_data = campaign_data.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(campaign, key, value)
-
+    # Build the response before commit expires the loaded row
+    response = CampaignResponse.model_validate(campaign)
     db.commit()
-    db.refresh(campaign)
-    return campaign
+    return response
 
 
 @router.delete("/{campaign_id}")
 async def delete_campaign(
     campaign_id: uuid.UUID,
-    current_user: User = Depends(get_current_user),
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """Delete a campaign."""
-    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
-    if not campaign:
+    # Drives, tokens, triggers and deployments go with it via ON DELETE CASCADE
+    result = db.execute(delete(Campaign).where(Campaign.id == campaign_id))
+    if not result.rowcount:
         raise HTTPException(status_code=404, detail="Campaign not found")
 
-    db.delete(campaign)
     db.commit()
     return {"message": "Campaign deleted"}
 
@@ -152,19 +172,17 @@ async def delete_campaign(
 @router.get("/{campaign_id}/stats", response_model=CampaignStats)
 async def get_campaign_stats(
     campaign_id: uuid.UUID,
-    current_user: User = Depends(get_current_user),
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """Get campaign statistics."""
-    from app.models.drive import Drive, DriveStatus
+    from app.models.drive import Drive
+    from app.models.token import Token
     from app.models.trigger import Trigger
 
-    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
-    if not campaign:
+    if not db.query(exists().where(Campaign.id == campaign_id)).scalar():
         raise HTTPException(status_code=404, detail="Campaign not found")
 
-    drives = campaign.drives or []
-
     # Count by status
     status_counts = {
         "created": 0,
@@ -173,28 +191,30 @@ async def get_campaign_stats(
         "triggered": 0,
         "recovered": 0,
     }
-    for drive in drives:
-        status_counts[drive.status.value] += 1
-
-    # Get all triggers for this campaign
-    drive_ids = [d.id for d in drives]
-    triggers = []
-    if drive_ids:
-        from app.models.token import Token
-        triggers = db.query(Trigger).join(Token).filter(Token.drive_id.in_(drive_ids)).all()
-
-    unique_ips = set()
-    for trigger in triggers:
-        if trigger.source_ip:
-            unique_ips.add(str(trigger.source_ip))
+    rows = (
+        db.query(Drive.status, func.count(Drive.id))
+        .filter(Drive.campaign_id == campaign_id)
+        .group_by(Drive.status)
+        .all()
+    )
+    for drive_status, count in rows:
+        status_counts[drive_status.value] = count
+
+    # Trigger totals for this campaign
+    total_triggers, unique_ips = (
+        db.query(func.count(Trigger.id), func.count(distinct(Trigger.source_ip)))
+        .join(Token)
+        .filter(Token.campaign_id == campaign_id)
+        .one()
+    )
 
     return CampaignStats(
-        total_drives=len(drives),
+        total_drives=sum(status_counts.values()),
         created=status_counts["created"],
         prepared=status_counts["prepared"],
         deployed=status_counts["deployed"],
         triggered=status_counts["triggered"],
         recovered=status_counts["recovered"],
-        total_triggers=len(triggers),
-        unique_ips=len(unique_ips),
+        total_triggers=total_triggers,
+        unique_ips=unique_ips,
     )
@@ -2,12 +2,12 @@
 
 from datetime import datetime
 from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import bindparam, exists, func, lambda_stmt, select, update
+from sqlalchemy.orm import Session, selectinload, undefer_group
 import uuid
-import io
 import zipfile
 
 from app.database import get_db
@@ -16,8 +16,8 @@ from app.models.campaign import Campaign
 from app.models.profile import Profile
 from app.models.deployment import Deployment
 from app.models.token import Token
-from app.models.user import User
-from app.routers.auth import get_current_user
+from app.models.trigger import Trigger
+from app.routers.auth import get_current_user_id
 from app.services.canary_client import CanaryTokensClient
 from app.services.usb_builder import USBBuilder
 
@@ -106,42 +106,82 @@ class DeploymentResponse(BaseModel):
         from_attributes = True
 
 
+class PreparedDriveResponse(BaseModel):
+    drive: DriveResponse
+    tokens: List[TokenResponse]
+
+
+class DriveStatusResponse(BaseModel):
+    drive: DriveResponse
+    tokens: List[TokenResponse]
+    trigger_count: int
+
+
+# Validate and serialize list responses entirely in pydantic-core
+_DRIVE_LIST_ADAPTER = TypeAdapter(List[DriveResponse])
+_TOKEN_LIST_ADAPTER = TypeAdapter(List[TokenResponse])
+
+# Non-primary-key lookups, built once so each call reuses the cached
+# compiled statement instead of rebuilding the query
+_DRIVE_BY_CODE_STMT = lambda_stmt(
+    lambda: select(Drive)
+    .where(Drive.unique_code == bindparam("code"))
+    .options(undefer_group("counts"))
+)
+_DEPLOYMENT_BY_DRIVE_STMT = lambda_stmt(
+    lambda: select(Deployment).where(Deployment.drive_id == bindparam("drive_id"))
+)
+
+
 @router.get("", response_model=List[DriveResponse])
 async def list_drives(
     campaign_id: Optional[uuid.UUID] = None,
     status: Optional[DriveStatus] = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    current_user: User = Depends(get_current_user),
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
-    """List all drives."""
-    query = db.query(Drive)
+    """List all drives. The unpaginated total is returned in X-Total-Count."""
+    # The window count comes back on every row of the page, so the total
+    # costs no extra round-trip
+    query = db.query(Drive, func.count().over()).options(undefer_group("counts"))
     if campaign_id:
         query = query.filter(Drive.campaign_id == campaign_id)
     if status:
         query = query.filter(Drive.status == status)
     query = query.order_by(Drive.created_at.desc())
-    drives = query.offset(skip).limit(limit).all()
-    return drives
+    rows = query.offset(skip).limit(limit).all()
+
+    if rows:
+        total = rows[0][1]
+    elif skip:
+        total = query.order_by(None).with_entities(func.count(Drive.id)).scalar()
+    else:
+        total = 0
+
+    drives = _DRIVE_LIST_ADAPTER.validate_python([d for d, _ in rows], from_attributes=True)
+    return Response(
+        _DRIVE_LIST_ADAPTER.dump_json(drives),
+        media_type="application/json",
+        headers={"X-Total-Count": str(total)},
+    )
 
 
 @router.post("", response_model=DriveResponse)
 async def create_drive(
     drive_data: DriveCreate,
-    current_user: User = Depends(get_current_user),
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """Create a new drive record."""
     # Verify campaign exists
-    campaign = db.query(Campaign).filter(Campaign.id == drive_data.campaign_id).first()
-    if not campaign:
+    if not db.query(exists().where(Campaign.id == drive_data.campaign_id)).scalar():
         raise HTTPException(status_code=404, detail="Campaign not found")
 
     # Verify profile exists if provided
     if drive_data.profile_id:
-        profile = db.query(Profile).filter(Profile.id == drive_data.profile_id).first()
-        if not profile:
+        if not db.query(exists().where(Profile.id == drive_data.profile_id)).scalar():
             raise HTTPException(status_code=404, detail="Profile not found")
 
     drive = Drive(**drive_data.model_dump())
@@ -154,24 +194,67 @@ async def create_drive(
 @router.get("/by-code/{code}", response_model=DriveResponse)
 async def get_drive_by_code(
     code: str,
-    current_user: User = Depends(get_current_user),
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """Get drive by unique code."""
-    drive = db.query(Drive).filter(Drive.unique_code == code).first()
+    drive = db.execute(_DRIVE_BY_CODE_STMT, {"code": code}).scalar_one_or_none()
     if not drive:
         raise HTTPException(status_code=404, detail="Drive not found")
     return drive
 
 
+@router.get("/by-code/{code}/status", response_model=DriveStatusResponse)
+async def get_drive_status_by_code(
+    code: str,
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    """Get a drive by unique code with its tokens and trigger counts."""
+    drive = db.execute(_DRIVE_BY_CODE_STMT, {"code": code}).scalar_one_or_none()
+    if not drive:
+        raise HTTPException(status_code=404, detail="Drive not found")
+
+    # Per-token trigger counts in one grouped query
+    rows = (
+        db.query(Token, func.count(Trigger.id))
+        .outerjoin(Trigger, Trigger.token_id == Token.id)
+        .filter(Token.drive_id == drive.id)
+        .group_by(Token.id)
+        .order_by(Token.created_at)
+        .all()
+    )
+    tokens = [
+        TokenResponse.model_construct(
+            id=token.id,
+            canary_token_id=token.canary_token_id,
+            token_type=token.token_type,
+            filename=token.filename,
+            memo=token.memo,
+            url=token.url,
+            created_at=token.created_at,
+            is_triggered=token.is_triggered,
+            trigger_count=trigger_count,
+        )
+        for token, trigger_count in rows
+    ]
+
+    status = DriveStatusResponse.model_construct(
+        drive=DriveResponse.model_validate(drive),
+        tokens=tokens,
+        trigger_count=drive.trigger_count,
+    )
+    return Response(status.model_dump_json(), media_type="application/json")
+
+
 @router.get("/{drive_id}", response_model=DriveResponse)
 async def get_drive(
     drive_id: uuid.UUID,
-    current_user: User = Depends(get_current_user),
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """Get drive by ID."""
-    drive = db.query(Drive).filter(Drive.id == drive_id).first()
+    drive = db.get(Drive, drive_id, options=[undefer_group("counts")])
     if not drive:
         raise HTTPException(status_code=404, detail="Drive not found")
     return drive
@@ -181,31 +264,38 @@ async def get_drive(
 async def update_drive(
     drive_id: uuid.UUID,
     drive_data: DriveUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """Update a drive."""
-    drive = db.query(Drive).filter(Drive.id == drive_id).first()
+    update_data = drive_data.model_dump(exclude_unset=True)
+    if update_data:
+        # Write without loading the row first; the response is read back below
+        db.execute(update(Drive).where(Drive.id == drive_id).values(**update_data))
+    drive = db.get(Drive, drive_id, options=[undefer_group("counts")])
     if not drive:
         raise HTTPException(status_code=404, detail="Drive not found")
 
-    update_data = drive_data.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(drive, key, value)
-
+    # Build the response before commit expires the loaded row
+    response = DriveResponse.model_validate(drive)
     db.commit()
-    db.refresh(drive)
-    return drive
+    return response
 
 
 @router.post("/{drive_id}/prepare", response_model=DriveResponse)
 async def prepare_drive(
     drive_id: uuid.UUID,
-    current_user: User = Depends(get_current_user),
+    include_tokens: bool = False,
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
-    """Prepare a drive - create tokens based on profile."""
-    drive = db.query(Drive).filter(Drive.id == drive_id).first()
+    """
+    Prepare a drive - create tokens based on profile.
+
+    With include_tokens, the created tokens are returned alongside the
+    drive as a PreparedDriveResponse, saving a follow-up tokens call.
+    """
+    drive = db.get(Drive, drive_id)
     if not drive:
         raise HTTPException(status_code=404, detail="Drive not found")
 
@@ -215,7 +305,7 @@ async def prepare_drive(
     if drive.status != DriveStatus.CREATED:
         raise HTTPException(status_code=400, detail="Drive is already prepared")
 
-    profile = db.query(Profile).filter(Profile.id == drive.profile_id).first()
+    profile = db.get(Profile, drive.profile_id)
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
 
@@ -232,30 +322,51 @@ async def prepare_drive(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to prepare drive: {str(e)}")
 
+    if include_tokens:
+        # The tokens were created just now, so none has been triggered yet
+        tokens = [
+            TokenResponse.model_construct(
+                id=token.id,
+                canary_token_id=token.canary_token_id,
+                token_type=token.token_type,
+                filename=token.filename,
+                memo=token.memo,
+                url=token.url,
+                created_at=token.created_at,
+                is_triggered=False,
+                trigger_count=0,
+            )
+            for token in db.query(Token).filter(Token.drive_id == drive.id).order_by(Token.created_at)
+        ]
+        prepared = PreparedDriveResponse.model_construct(
+            drive=DriveResponse.model_validate(drive),
+            tokens=tokens,
+        )
+        return Response(prepared.model_dump_json(), media_type="application/json")
+
     return drive
 
 
 @router.get("/{drive_id}/download")
 async def download_drive_zip(
     drive_id: uuid.UUID,
-    current_user: User = Depends(get_current_user),
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """Download a ZIP file containing all drive files."""
-    drive = db.query(Drive).filter(Drive.id == drive_id).first()
+    drive = db.get(Drive, drive_id)
     if not drive:
         raise HTTPException(status_code=404, detail="Drive not found")
 
     if drive.status == DriveStatus.CREATED:
         raise HTTPException(status_code=400, detail="Drive not prepared yet")
 
-    # Build ZIP file in memory
+    # Stream the ZIP as it is built
     try:
         builder = USBBuilder(db)
-        zip_buffer = await builder.create_zip(drive)
 
         return StreamingResponse(
-            io.BytesIO(zip_buffer),
+            builder.stream_zip(drive),
             media_type="application/zip",
             headers={
                 "Content-Disposition": f"attachment; filename={drive.unique_code}.zip"
@@ -269,11 +380,11 @@ async def download_drive_zip(
 async def deploy_drive(
     drive_id: uuid.UUID,
     deployment_data: DeploymentCreate,
-    current_user: User = Depends(get_current_user),
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """Record deployment of a drive."""
-    drive = db.query(Drive).filter(Drive.id == drive_id).first()
+    drive = db.get(Drive, drive_id)
     if not drive:
         raise HTTPException(status_code=404, detail="Drive not found")
 
@@ -281,12 +392,12 @@ async def deploy_drive(
         raise HTTPException(status_code=400, detail="Drive must be prepared before deployment")
 
     # Check if already deployed
-    existing = db.query(Deployment).filter(Deployment.drive_id == drive_id).first()
+    existing = db.execute(_DEPLOYMENT_BY_DRIVE_STMT, {"drive_id": drive_id}).scalar_one_or_none()
     if existing:
-        # Update existing deployment
-        for key, value in deployment_data.model_dump(exclude_unset=True).items():
-            setattr(existing, key, value)
-        existing.deployed_at = datetime.utcnow()
+        # Update existing deployment with only the fields the client sent
+        for key in deployment_data.model_fields_set:
+            setattr(existing, key, getattr(deployment_data, key))
+        existing.deployed_at = func.now()
         deployment = existing
     else:
         # Create new deployment
@@ -308,25 +419,26 @@ async def deploy_drive(
 @router.get("/{drive_id}/tokens", response_model=List[TokenResponse])
 async def get_drive_tokens(
     drive_id: uuid.UUID,
-    current_user: User = Depends(get_current_user),
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """Get all tokens for a drive."""
-    drive = db.query(Drive).filter(Drive.id == drive_id).first()
+    drive = db.get(Drive, drive_id, options=[selectinload(Drive.tokens)])
     if not drive:
         raise HTTPException(status_code=404, detail="Drive not found")
 
-    return drive.tokens or []
+    tokens = _TOKEN_LIST_ADAPTER.validate_python(drive.tokens, from_attributes=True)
+    return Response(_TOKEN_LIST_ADAPTER.dump_json(tokens), media_type="application/json")
 
 
 @router.get("/{drive_id}/deployment", response_model=DeploymentResponse)
 async def get_drive_deployment(
     drive_id: uuid.UUID,
-    current_user: User = Depends(get_current_user),
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
     """Get deployment info for a drive."""
-    deployment = db.query(Deployment).filter(Deployment.drive_id == drive_id).first()
+    deployment = db.execute(_DEPLOYMENT_BY_DRIVE_STMT, {"drive_id": drive_id}).scalar_one_or_none()
     if not deployment:
         raise HTTPException(status_code=404, detail="Deployment not found")
 
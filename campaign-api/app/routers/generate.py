@@ -1,19 +1,27 @@
 """Content generation router - OpenAI integration."""
 
+import asyncio
+import logging
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Response, UploadFile, File
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
+import orjson
 import uuid
 
 from app.database import get_db
 from app.models.content import GeneratedContent
+from app.models.document_batch import DocumentBatch
 from app.models.profile import Profile
 from app.models.user import User
 from app.routers.auth import get_current_user
 from app.services.content_generator import ContentGenerator
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Concurrent OpenAI calls per generate-all request
+GENERATE_ALL_CONCURRENCY = 8
 
 
 class DocumentRequest(BaseModel):
@@ -49,6 +57,42 @@ class TemplateInfo(BaseModel):
     document_type: str
 
 
+# Static template catalogue, serialized once at import
+TEMPLATES = [
+    TemplateInfo(
+        name="Salary Report",
+        description="Employee salary and compensation document",
+        example_prompt="Create a confidential employee salary report for Q4 2024 showing compensation data for the engineering department.",
+        document_type="salary",
+    ),
+    TemplateInfo(
+        name="HR Policy",
+        description="Human resources policy document",
+        example_prompt="Create an HR policy document about remote work guidelines and expense reimbursement procedures.",
+        document_type="hr",
+    ),
+    TemplateInfo(
+        name="Financial Projection",
+        description="Financial forecasting spreadsheet content",
+        example_prompt="Create content for a financial projection showing revenue forecasts and budget allocations.",
+        document_type="financial",
+    ),
+    TemplateInfo(
+        name="Technical Documentation",
+        description="Technical or IT documentation",
+        example_prompt="Create AWS infrastructure documentation including server configurations and access credentials.",
+        document_type="technical",
+    ),
+    TemplateInfo(
+        name="Meeting Notes",
+        description="Meeting minutes or notes",
+        example_prompt="Create meeting notes from an executive strategy session discussing M&A targets.",
+        document_type="general",
+    ),
+]
+_TEMPLATES_JSON = orjson.dumps([t.model_dump() for t in TEMPLATES])
+
+
 @router.post("/document", response_model=ContentResponse)
 async def generate_document(
     request: DocumentRequest,
@@ -97,47 +141,25 @@ async def list_templates(
     current_user: User = Depends(get_current_user),
 ):
     """List available document templates."""
-    return [
-        TemplateInfo(
-            name="Salary Report",
-            description="Employee salary and compensation document",
-            example_prompt="Create a confidential employee salary report for Q4 2024 showing compensation data for the engineering department.",
-            document_type="salary",
-        ),
-        TemplateInfo(
-            name="HR Policy",
-            description="Human resources policy document",
-            example_prompt="Create an HR policy document about remote work guidelines and expense reimbursement procedures.",
-            document_type="hr",
-        ),
-        TemplateInfo(
-            name="Financial Projection",
-            description="Financial forecasting spreadsheet content",
-            example_prompt="Create content for a financial projection showing revenue forecasts and budget allocations.",
-            document_type="financial",
-        ),
-        TemplateInfo(
-            name="Technical Documentation",
-            description="Technical or IT documentation",
-            example_prompt="Create AWS infrastructure documentation including server configurations and access credentials.",
-            document_type="technical",
-        ),
-        TemplateInfo(
-            name="Meeting Notes",
-            description="Meeting minutes or notes",
-            example_prompt="Create meeting notes from an executive strategy session discussing M&A targets.",
-            document_type="general",
-        ),
-    ]
+    return Response(content=_TEMPLATES_JSON, media_type="application/json")
 
 
 @router.post("/profile/{profile_id}/generate-all")
 async def generate_profile_content(
     profile_id: uuid.UUID,
+    batch: bool = False,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Generate all AI content for a profile's templates."""
+    """
+    Generate all AI content for a profile's templates.
+
+    With batch=true, documents are queued on the OpenAI Batch API at half
+    the cost and stored when the batch completes (up to 24 hours); they are
+    reported as "queued" with the batch id. The batch is recorded in the
+    database and collected by the document batch poller, so it survives
+    restarts. Images are always generated immediately.
+    """
     profile = db.query(Profile).filter(Profile.id == profile_id).first()
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
@@ -147,41 +169,72 @@ async def generate_profile_content(
         raise HTTPException(status_code=400, detail="Profile has no AI prompts configured")
 
     generator = ContentGenerator()
-    results = []
+    semaphore = asyncio.Semaphore(GENERATE_ALL_CONCURRENCY)
 
-    try:
-        # Generate documents
-        for doc_prompt in ai_prompts.get("documents", []):
-            content = await generator.generate_document(
-                prompt=doc_prompt.get("prompt", ""),
-                document_type=doc_prompt.get("type", "general"),
-                filename=doc_prompt.get("filename", "document.docx"),
-                profile_id=profile_id,
-                db=db,
-            )
+    async def bounded(coro):
+        async with semaphore:
+            return await coro
+
+    results = []
+    doc_prompts = ai_prompts.get("documents", [])
+    if batch and doc_prompts:
+        batch_id = await generator.submit_documents_batch(doc_prompts)
+        db.add(DocumentBatch(id=batch_id, profile_id=profile_id, jobs=doc_prompts))
+        db.commit()
+        for doc_prompt in doc_prompts:
             results.append({
                 "type": "document",
-                "filename": content.filename,
-                "status": "success"
+                "filename": doc_prompt.get("filename", "document.docx"),
+                "status": "queued",
+                "batch_id": batch_id,
             })
-
-        # Generate images
-        for img_prompt in ai_prompts.get("images", []):
-            content = await generator.generate_image(
-                prompt=img_prompt.get("prompt", ""),
-                size=img_prompt.get("size", "1024x1024"),
-                style=img_prompt.get("style", "natural"),
-                filename=img_prompt.get("filename", "image.png"),
-                profile_id=profile_id,
-                db=db,
-            )
+        doc_prompts = []
+
+    # Rows are saved together below, so the generator is not given the session
+    jobs = []
+    for doc_prompt in doc_prompts:
+        filename = doc_prompt.get("filename", "document.docx")
+        jobs.append(("document", filename, generator.generate_document(
+            prompt=doc_prompt.get("prompt", ""),
+            document_type=doc_prompt.get("type", "general"),
+            filename=filename,
+            profile_id=profile_id,
+        )))
+    for img_prompt in ai_prompts.get("images", []):
+        filename = img_prompt.get("filename", "image.png")
+        jobs.append(("image", filename, generator.generate_image(
+            prompt=img_prompt.get("prompt", ""),
+            size=img_prompt.get("size", "1024x1024"),
+            style=img_prompt.get("style", "natural"),
+            filename=filename,
+            profile_id=profile_id,
+        )))
+
+    outcomes = await asyncio.gather(
+        *(bounded(coro) for _, _, coro in jobs),
+        return_exceptions=True,
+    )
+
+    generated = []
+    for (content_type, filename, _), outcome in zip(jobs, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error(f"Failed to generate {content_type} {filename}: {outcome}")
+            results.append({
+                "type": content_type,
+                "filename": filename,
+                "status": "failed",
+                "error": str(outcome),
+            })
+        else:
+            generated.append(outcome)
             results.append({
-                "type": "image",
-                "filename": content.filename,
+                "type": content_type,
+                "filename": outcome.filename,
                 "status": "success"
             })
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Generation failed: {str(e)}")
+    if generated:
+        db.add_all(generated)
+        db.commit()
 
     return {"profile_id": str(profile_id), "generated": results}
@@ -2,9 +2,13 @@
 
 from datetime import datetime
 from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, Query
-from pydantic import BaseModel
+from collections import Counter
+from cachetools import LRUCache
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import delete, func
 from sqlalchemy.orm import Session
+import hashlib
 import uuid
 
 from app.database import get_db
@@ -14,6 +18,14 @@ from app.routers.auth import get_current_user
 
 router = APIRouter()
 
+# Profiles change rarely; clients may reuse a response briefly and then
+# revalidate it with If-None-Match
+PROFILE_CACHE_CONTROL = "private, max-age=60, stale-while-revalidate=300"
+
+# Built previews keyed by (profile id, updated_at); any edit bumps
+# updated_at, so stale entries are never hit and simply age out
+_preview_cache = LRUCache(maxsize=1024)
+
 
 # Pydantic models
 class ProfileCreate(BaseModel):
@@ -48,7 +60,7 @@ class ProfileResponse(BaseModel):
     token_config: dict
     ai_prompts: dict
     label_suggestions: List[str]
-    is_system: str
+    is_system: bool
     created_at: datetime
     updated_at: datetime
 
@@ -56,6 +68,10 @@ class ProfileResponse(BaseModel):
         from_attributes = True
 
 
+# Validate and serialize list responses entirely in pydantic-core
+_PROFILE_LIST_ADAPTER = TypeAdapter(List[ProfileResponse])
+
+
 class FilePreview(BaseModel):
     path: str
     type: str
@@ -68,8 +84,64 @@ class ProfilePreview(BaseModel):
     token_summary: dict
 
 
+def _etag(*parts) -> str:
+    """Build a strong ETag from the values that identify a representation."""
+    digest = hashlib.blake2b(":".join(str(p) for p in parts).encode()).hexdigest()[:16]
+    return f'"{digest}"'
+
+
+def _not_modified(request: Request, etag: str) -> Optional[Response]:
+    """Return a 304 response if the client already holds this ETag."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(
+            status_code=304,
+            headers={"ETag": etag, "Cache-Control": PROFILE_CACHE_CONTROL},
+        )
+    return None
+
+
+def _set_cache_headers(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = PROFILE_CACHE_CONTROL
+
+
+def _build_preview(profile: Profile) -> ProfilePreview:
+    """List the folders and files a profile would create."""
+    file_structure = profile.file_structure or {}
+    file_defs = file_structure.get("files", [])
+
+    # Parse folders
+    files = [
+        FilePreview(path=f"{folder}/", type="folder")
+        for folder in file_structure.get("folders", [])
+    ]
+
+    # Parse files
+    for file_def in file_defs:
+        folder = file_def.get("folder", "")
+        name = file_def.get("name", "")
+        files.append(FilePreview(
+            path=f"{folder}/{name}" if folder else name,
+            type="file",
+            token_type=file_def.get("type", ""),
+        ))
+
+    # Count tokens
+    token_summary = Counter(
+        token_type for file_def in file_defs if (token_type := file_def.get("type"))
+    )
+
+    return ProfilePreview(
+        profile_id=profile.id,
+        files=files,
+        token_summary=dict(token_summary),
+    )
+
+
 @router.get("", response_model=List[ProfileResponse])
 async def list_profiles(
+    request: Request,
     scenario_type: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -78,8 +150,23 @@ async def list_profiles(
     query = db.query(Profile)
     if scenario_type:
         query = query.filter(Profile.scenario_type == scenario_type)
-    profiles = query.order_by(Profile.name).all()
-    return profiles
+
+    # Any insert, update or delete moves the latest timestamp or the count,
+    # so the ETag can be checked without loading the profiles
+    last_updated, count = query.with_entities(
+        func.max(Profile.updated_at), func.count(Profile.id)
+    ).one()
+    etag = _etag(scenario_type, last_updated and last_updated.timestamp(), count)
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+
+    profiles = _PROFILE_LIST_ADAPTER.validate_python(
+        query.order_by(Profile.name).all(), from_attributes=True
+    )
+    response = Response(_PROFILE_LIST_ADAPTER.dump_json(profiles), media_type="application/json")
+    _set_cache_headers(response, etag)
+    return response
 
 
 @router.post("", response_model=ProfileResponse)
@@ -99,6 +186,8 @@ async def create_profile(
 @router.get("/{profile_id}", response_model=ProfileResponse)
 async def get_profile(
     profile_id: uuid.UUID,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -106,6 +195,13 @@ async def get_profile(
     profile = db.query(Profile).filter(Profile.id == profile_id).first()
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
+
+    etag = _etag(profile.id, profile.updated_at.timestamp())
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+
+    _set_cache_headers(response, etag)
     return profile
 
 
@@ -121,7 +217,7 @@ async def update_profile(
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
 
-    if profile.is_system == "true":
+    if profile.is_system:
         raise HTTPException(status_code=400, detail="Cannot modify system profiles")
 
     update_data = profile_data.model_dump(exclude_unset=True)
@@ -140,14 +236,15 @@ async def delete_profile(
     db: Session = Depends(get_db)
 ):
     """Delete a profile."""
-    profile = db.query(Profile).filter(Profile.id == profile_id).first()
-    if not profile:
+    is_system = db.query(Profile.is_system).filter(Profile.id == profile_id).scalar()
+    if is_system is None:
         raise HTTPException(status_code=404, detail="Profile not found")
 
-    if profile.is_system == "true":
+    if is_system:
         raise HTTPException(status_code=400, detail="Cannot delete system profiles")
 
-    db.delete(profile)
+    # Drives and generated content are detached by ON DELETE SET NULL
+    db.execute(delete(Profile).where(Profile.id == profile_id))
     db.commit()
     return {"message": "Profile deleted"}
 
@@ -155,6 +252,8 @@ async def delete_profile(
 @router.get("/{profile_id}/preview", response_model=ProfilePreview)
 async def preview_profile(
     profile_id: uuid.UUID,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -163,31 +262,14 @@ async def preview_profile(
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
 
-    files = []
-    token_summary = {}
-
-    file_structure = profile.file_structure or {}
-    token_config = profile.token_config or {}
-
-    # Parse folders
-    folders = file_structure.get("folders", [])
-    for folder in folders:
-        files.append(FilePreview(path=f"{folder}/", type="folder"))
-
-    # Parse files
-    for file_def in file_structure.get("files", []):
-        folder = file_def.get("folder", "")
-        name = file_def.get("name", "")
-        token_type = file_def.get("type", "")
-        path = f"{folder}/{name}" if folder else name
-        files.append(FilePreview(path=path, type="file", token_type=token_type))
-
-        # Count tokens
-        if token_type:
-            token_summary[token_type] = token_summary.get(token_type, 0) + 1
-
-    return ProfilePreview(
-        profile_id=profile_id,
-        files=files,
-        token_summary=token_summary,
-    )
+    etag = _etag(profile.id, profile.updated_at.timestamp())
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+    _set_cache_headers(response, etag)
+
+    key = (profile.id, profile.updated_at)
+    preview = _preview_cache.get(key)
+    if preview is None:
+        preview = _preview_cache[key] = _build_preview(profile)
+    return preview
@@ -2,15 +2,16 @@
 
 from datetime import datetime
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, distinct, func, literal_column, select
+from sqlalchemy.orm import Session, joinedload
+import queue
+import threading
 import uuid
-import io
-import csv
 
-from app.database import get_db
+from app.database import engine, get_db
 from app.models.campaign import Campaign
 from app.models.drive import Drive
 from app.models.token import Token
@@ -21,6 +22,9 @@ from app.routers.auth import get_current_user
 
 router = APIRouter()
 
+# Approximate size of each chunk sent while streaming CSV exports
+CSV_STREAM_CHUNK_BYTES = 64 * 1024
+
 
 class CampaignReport(BaseModel):
     campaign_id: uuid.UUID
@@ -40,28 +44,55 @@ class CampaignReport(BaseModel):
     drives: list
 
 
+# Report handlers are plain defs: their aggregate queries block, so FastAPI
+# runs them in the threadpool instead of on the event loop.
 @router.get("/campaign/{campaign_id}", response_model=CampaignReport)
-async def get_campaign_report(
+def get_campaign_report(
     campaign_id: uuid.UUID,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get detailed campaign report."""
-    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    campaign = db.get(Campaign, campaign_id)
     if not campaign:
         raise HTTPException(status_code=404, detail="Campaign not found")
 
-    drives = campaign.drives or []
+    # Campaign-wide token/trigger totals
+    total_tokens, total_triggers, unique_ips, first_trigger, last_trigger = (
+        db.query(
+            func.count(distinct(Token.id)),
+            func.count(Trigger.id),
+            func.count(distinct(Trigger.source_ip)),
+            func.min(Trigger.triggered_at),
+            func.max(Trigger.triggered_at),
+        )
+        .select_from(Token)
+        .outerjoin(Trigger)
+        .filter(Token.campaign_id == campaign_id)
+        .one()
+    )
+
+    # Per-drive token/trigger counts
+    drive_counts = {
+        drive_id: (token_count, trigger_count)
+        for drive_id, token_count, trigger_count in (
+            db.query(Token.drive_id, func.count(distinct(Token.id)), func.count(Trigger.id))
+            .outerjoin(Trigger)
+            .filter(Token.campaign_id == campaign_id)
+            .group_by(Token.drive_id)
+            .all()
+        )
+    }
+
+    drives = (
+        db.query(Drive)
+        .options(joinedload(Drive.deployment))
+        .filter(Drive.campaign_id == campaign_id)
+        .all()
+    )
 
-    # Collect stats
-    total_tokens = 0
-    total_triggers = 0
-    unique_ips = set()
-    first_trigger = None
-    last_trigger = None
     drives_deployed = 0
     drives_triggered = 0
-
     drive_details = []
 
     for drive in drives:
@@ -70,22 +101,7 @@ async def get_campaign_report(
         if drive.status.value == "triggered":
             drives_triggered += 1
 
-        tokens = drive.tokens or []
-        total_tokens += len(tokens)
-
-        drive_triggers = 0
-        for token in tokens:
-            triggers = token.triggers or []
-            drive_triggers += len(triggers)
-            total_triggers += len(triggers)
-
-            for trigger in triggers:
-                if trigger.source_ip:
-                    unique_ips.add(str(trigger.source_ip))
-                if first_trigger is None or trigger.triggered_at < first_trigger:
-                    first_trigger = trigger.triggered_at
-                if last_trigger is None or trigger.triggered_at > last_trigger:
-                    last_trigger = trigger.triggered_at
+        token_count, trigger_count = drive_counts.get(drive.id, (0, 0))
 
         # Get deployment info
         deployment = drive.deployment
@@ -102,13 +118,15 @@ async def get_campaign_report(
             "unique_code": drive.unique_code,
             "status": drive.status.value,
             "label": drive.label,
-            "token_count": len(tokens),
-            "trigger_count": drive_triggers,
+            "token_count": token_count,
+            "trigger_count": trigger_count,
             "deployment": deployment_info,
             "created_at": drive.created_at.isoformat(),
         })
 
-    return CampaignReport(
+    # Every value above comes from the database already typed, so skip
+    # validation on construction and again on the way out
+    report = CampaignReport.model_construct(
         campaign_id=campaign.id,
         campaign_name=campaign.name,
         client_name=campaign.client_name,
@@ -120,107 +138,179 @@ async def get_campaign_report(
         drives_triggered=drives_triggered,
         total_tokens=total_tokens,
         total_triggers=total_triggers,
-        unique_source_ips=len(unique_ips),
+        unique_source_ips=unique_ips,
         first_trigger=first_trigger,
         last_trigger=last_trigger,
         drives=drive_details,
     )
+    return Response(report.model_dump_json(), media_type="application/json")
 
 
 @router.get("/export/{campaign_id}/csv")
-async def export_campaign_csv(
+def export_campaign_csv(
     campaign_id: uuid.UUID,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Export campaign data as CSV."""
-    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
-    if not campaign:
+    campaign_name = db.query(Campaign.name).filter(Campaign.id == campaign_id).scalar()
+    if campaign_name is None:
         raise HTTPException(status_code=404, detail="Campaign not found")
 
-    # Build CSV
-    output = io.StringIO()
-    writer = csv.writer(output)
-
-    # Write header
-    writer.writerow([
-        "Drive Code", "Drive Status", "Drive Label",
-        "Token Type", "Token Filename",
-        "Trigger Time", "Source IP", "City", "Country", "User Agent",
-        "Deployment Location", "Deployment Time"
-    ])
-
-    # Write data
-    for drive in campaign.drives or []:
-        deployment = drive.deployment
-        dep_location = deployment.location_name if deployment else ""
-        dep_time = deployment.deployed_at.isoformat() if deployment and deployment.deployed_at else ""
-
-        for token in drive.tokens or []:
-            if token.triggers:
-                for trigger in token.triggers:
-                    writer.writerow([
-                        drive.unique_code,
-                        drive.status.value,
-                        drive.label or "",
-                        token.token_type,
-                        token.filename or "",
-                        trigger.triggered_at.isoformat() if trigger.triggered_at else "",
-                        str(trigger.source_ip) if trigger.source_ip else "",
-                        trigger.geo_city or "",
-                        trigger.geo_country or "",
-                        trigger.user_agent or "",
-                        dep_location,
-                        dep_time,
-                    ])
-            else:
-                # Token with no triggers
-                writer.writerow([
-                    drive.unique_code,
-                    drive.status.value,
-                    drive.label or "",
-                    token.token_type,
-                    token.filename or "",
-                    "", "", "", "", "",
-                    dep_location,
-                    dep_time,
-                ])
-
-    output.seek(0)
-
     return StreamingResponse(
-        iter([output.getvalue()]),
+        _campaign_csv_rows(campaign_id),
         media_type="text/csv",
         headers={
-            "Content-Disposition": f"attachment; filename={campaign.name.replace(' ', '_')}_report.csv"
+            "Content-Disposition": f"attachment; filename={campaign_name.replace(' ', '_')}_report.csv"
         }
     )
 
 
+def _iso(column):
+    """Render a timestamptz column as ISO 8601, matching datetime.isoformat()."""
+    return func.to_char(column, literal_column("""'YYYY-MM-DD"T"HH24:MI:SS.USTZH:TZM'"""))
+
+
+# One row per trigger; tokens without triggers get a single row with the
+# trigger columns blank. Compiled once; COPY serializes it to CSV in Postgres.
+_CSV_EXPORT_SQL = str(
+    select(
+        Drive.unique_code.label("Drive Code"),
+        Drive.status.label("Drive Status"),
+        Drive.label.label("Drive Label"),
+        Token.token_type.label("Token Type"),
+        Token.filename.label("Token Filename"),
+        _iso(Trigger.triggered_at).label("Trigger Time"),
+        func.host(Trigger.source_ip).label("Source IP"),
+        Trigger.geo_city.label("City"),
+        Trigger.geo_country.label("Country"),
+        Trigger.user_agent.label("User Agent"),
+        Deployment.location_name.label("Deployment Location"),
+        _iso(Deployment.deployed_at).label("Deployment Time"),
+    )
+    .select_from(Token)
+    .join(Drive, Token.drive_id == Drive.id)
+    .outerjoin(Trigger, Trigger.token_id == Token.id)
+    .outerjoin(Deployment, Deployment.drive_id == Drive.id)
+    .where(Token.campaign_id == bindparam("campaign_id"))
+    .order_by(Drive.created_at, Drive.id, Token.id, Trigger.triggered_at)
+    .compile(dialect=engine.dialect)
+)
+
+
+class _CopySink:
+    """
+    File-like target for COPY TO STDOUT.
+
+    Buffers the CSV Postgres sends and hands it to the response in chunks
+    of about CSV_STREAM_CHUNK_BYTES. Raises once the response is gone so
+    an abandoned export stops the COPY.
+    """
+
+    def __init__(self, chunks: queue.Queue, cancelled: threading.Event):
+        self._chunks = chunks
+        self._cancelled = cancelled
+        self._buffer = []
+        self._size = 0
+
+    def write(self, data):
+        self._buffer.append(data)
+        self._size += len(data)
+        if self._size >= CSV_STREAM_CHUNK_BYTES:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self.put(b"".join(self._buffer))
+            self._buffer.clear()
+            self._size = 0
+
+    def put(self, item):
+        while True:
+            if self._cancelled.is_set():
+                raise RuntimeError("CSV export cancelled")
+            try:
+                self._chunks.put(item, timeout=1)
+                return
+            except queue.Full:
+                pass
+
+
+def _copy_campaign_csv(campaign_id: uuid.UUID, sink: _CopySink):
+    """Run the export COPY on a pooled connection, feeding the sink."""
+    conn = engine.raw_connection()
+    try:
+        with conn.cursor() as cursor:
+            query = cursor.mogrify(_CSV_EXPORT_SQL, {"campaign_id": str(campaign_id)}).decode()
+            cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)", sink)
+        conn.rollback()
+        sink.flush()
+        sink.put(None)
+    except Exception as e:
+        # A COPY aborted midway leaves the connection in an unknown state
+        conn.invalidate()
+        try:
+            sink.put(e)
+        except RuntimeError:
+            pass  # Response already gone
+    finally:
+        conn.close()
+
+
+def _campaign_csv_rows(campaign_id: uuid.UUID):
+    """
+    Yield the campaign CSV as Postgres produces it.
+
+    The request's session is closed before the body starts streaming, and
+    copy_expert blocks until the COPY finishes, so the COPY runs on its own
+    connection in a worker thread and passes chunks back through a queue.
+    """
+    chunks = queue.Queue(maxsize=8)
+    cancelled = threading.Event()
+    threading.Thread(
+        target=_copy_campaign_csv,
+        args=(campaign_id, _CopySink(chunks, cancelled)),
+        name="csv-export",
+        daemon=True,
+    ).start()
+
+    try:
+        while True:
+            chunk = chunks.get()
+            if chunk is None:
+                return
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+    finally:
+        cancelled.set()
+
+
 @router.get("/summary")
-async def get_summary_stats(
+def get_summary_stats(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get overall system summary statistics."""
     from app.models.campaign import CampaignStatus
+    from app.models.drive import DriveStatus
 
-    campaigns = db.query(Campaign).all()
-    drives = db.query(Drive).all()
-    triggers = db.query(Trigger).all()
-
-    active_campaigns = sum(1 for c in campaigns if c.status == CampaignStatus.ACTIVE)
+    total_campaigns, active_campaigns = db.query(
+        func.count(Campaign.id),
+        func.count(Campaign.id).filter(Campaign.status == CampaignStatus.ACTIVE),
+    ).one()
+    drives_by_status = dict(
+        db.query(Drive.status, func.count(Drive.id)).group_by(Drive.status).all()
+    )
+    total_triggers = db.query(func.count(Trigger.id)).scalar()
 
     return {
-        "total_campaigns": len(campaigns),
+        "total_campaigns": total_campaigns,
         "active_campaigns": active_campaigns,
-        "total_drives": len(drives),
-        "total_triggers": len(triggers),
+        "total_drives": sum(drives_by_status.values()),
+        "total_triggers": total_triggers,
         "drives_by_status": {
-            "created": sum(1 for d in drives if d.status.value == "created"),
-            "prepared": sum(1 for d in drives if d.status.value == "prepared"),
-            "deployed": sum(1 for d in drives if d.status.value == "deployed"),
-            "triggered": sum(1 for d in drives if d.status.value == "triggered"),
-            "recovered": sum(1 for d in drives if d.status.value == "recovered"),
+            drive_status.value: drives_by_status.get(drive_status, 0)
+            for drive_status in DriveStatus
         }
     }
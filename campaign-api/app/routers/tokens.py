@@ -1,8 +1,10 @@
 """Tokens router."""
 
+from datetime import datetime
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import delete, exists
 from sqlalchemy.orm import Session
 import uuid
 
@@ -37,12 +39,16 @@ class TriggerResponse(BaseModel):
     user_agent: str | None
     geo_city: str | None
     geo_country: str | None
-    triggered_at: str
+    triggered_at: datetime
 
     class Config:
         from_attributes = True
 
 
+# Serialize trigger lists straight from result rows in pydantic-core
+_TRIGGER_LIST_ADAPTER = TypeAdapter(List[TriggerResponse])
+
+
 @router.get("/{token_id}", response_model=TokenResponse)
 async def get_token(
     token_id: uuid.UUID,
@@ -63,35 +69,50 @@ async def get_token_triggers(
     db: Session = Depends(get_db)
 ):
     """Get all triggers for a token."""
-    token = db.query(Token).filter(Token.id == token_id).first()
-    if not token:
+    if not db.query(exists().where(Token.id == token_id)).scalar():
         raise HTTPException(status_code=404, detail="Token not found")
 
-    triggers = db.query(Trigger).filter(Trigger.token_id == token_id).order_by(
+    # Only the response columns; raw payloads can be large
+    rows = db.query(
+        Trigger.id,
+        Trigger.source_ip,
+        Trigger.user_agent,
+        Trigger.geo_city,
+        Trigger.geo_country,
+        Trigger.triggered_at,
+    ).filter(Trigger.token_id == token_id).order_by(
         Trigger.triggered_at.desc()
     ).all()
 
-    return triggers
+    triggers = _TRIGGER_LIST_ADAPTER.validate_python(rows, from_attributes=True)
+    return Response(_TRIGGER_LIST_ADAPTER.dump_json(triggers), media_type="application/json")
+
+
+async def _delete_remote_token(canary_token_id: str):
+    """Delete a token from the CanaryTokens server, ignoring failures."""
+    try:
+        client = CanaryTokensClient()
+        await client.delete_token(canary_token_id)
+    except Exception:
+        pass  # The local record is already gone
 
 
 @router.delete("/{token_id}")
 async def delete_token(
     token_id: uuid.UUID,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Delete a token."""
-    token = db.query(Token).filter(Token.id == token_id).first()
-    if not token:
+    # Triggers go with it via ON DELETE CASCADE
+    canary_token_id = db.execute(
+        delete(Token).where(Token.id == token_id).returning(Token.canary_token_id)
+    ).scalar_one_or_none()
+    if canary_token_id is None:
         raise HTTPException(status_code=404, detail="Token not found")
-
-    # Delete from CanaryTokens server
-    try:
-        client = CanaryTokensClient()
-        await client.delete_token(token.canary_token_id)
-    except Exception:
-        pass  # Continue even if remote delete fails
-
-    db.delete(token)
     db.commit()
+
+    # Delete from CanaryTokens server after the response is sent
+    background_tasks.add_task(_delete_remote_token, canary_token_id)
     return {"message": "Token deleted"}
@@ -1,20 +1,38 @@
 """Webhooks router - receive alerts from CanaryTokens."""
 
-from datetime import datetime
+from typing import Optional, Tuple
 from fastapi import APIRouter, Request, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 import logging
 
 from app.database import SessionLocal
 from app.models.token import Token
 from app.models.trigger import Trigger
-from app.models.drive import Drive, DriveStatus
+from app.models.drive import Drive
 from app.services.slack_notifier import SlackNotifier
 from app.services.geo_service import GeoService
+from app.services.trigger_writer import trigger_writer
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Payload keys that carry the token ID, in order of preference.
+# CanaryTokens sends various formats depending on token type.
+TOKEN_ID_KEYS = ("token", "canarytoken")
+
+
+def _extract_token_id(payload: dict) -> Optional[str]:
+    """Pull the token ID from an alert payload, falling back to the memo."""
+    for key in TOKEN_ID_KEYS:
+        token_id = payload.get(key)
+        if token_id:
+            return token_id
+
+    # Memos are "<identifier>|<detail>"; use the leading field, or the
+    # whole memo if it has no separator
+    memo = payload.get("memo") or ""
+    return memo.split("|", 1)[0] or None
+
 
 @router.post("/canary")
 async def receive_canary_alert(
@@ -35,16 +53,7 @@ async def receive_canary_alert(
 
         logger.info(f"Received canary alert: {payload}")
 
-        # Extract token ID from payload
-        # CanaryTokens sends various formats depending on token type
-        canary_token_id = payload.get("token") or payload.get("canarytoken") or payload.get("memo", "").split("|")[0] if "|" in payload.get("memo", "") else None
-
-        if not canary_token_id:
-            # Try to extract from memo field
-            memo = payload.get("memo", "")
-            if memo:
-                canary_token_id = memo
-
+        canary_token_id = _extract_token_id(payload)
         if not canary_token_id:
             logger.warning(f"Could not extract token ID from payload: {payload}")
             return {"status": "received", "warning": "Could not identify token"}
@@ -63,18 +72,30 @@ async def receive_canary_alert(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-async def process_alert(canary_token_id: str, payload: dict):
-    """Process an incoming alert."""
+def _find_token(canary_token_id: str, memo: str) -> Tuple[Optional[Token], Optional[Drive]]:
+    """Look up the alerted token and its drive. Blocking; run in the threadpool."""
     db = SessionLocal()
     try:
-        # Find token in database
-        token = db.query(Token).filter(Token.canary_token_id == canary_token_id).first()
+        # Token and its drive come back together in one round-trip
+        query = db.query(Token, Drive).outerjoin(Drive, Drive.id == Token.drive_id)
 
-        if not token:
+        row = query.filter(Token.canary_token_id == canary_token_id).first()
+
+        if not row and memo:
             # Try partial match on memo
-            memo = payload.get("memo", "")
-            if memo:
-                token = db.query(Token).filter(Token.memo.contains(memo)).first()
+            row = query.filter(Token.memo.contains(memo)).first()
+
+        return tuple(row) if row else (None, None)
+    finally:
+        db.close()
+
+
+async def process_alert(canary_token_id: str, payload: dict):
+    """Process an incoming alert."""
+    try:
+        token, drive = await run_in_threadpool(
+            _find_token, canary_token_id, payload.get("memo", "")
+        )
 
         if not token:
             logger.warning(f"Token not found: {canary_token_id}")
@@ -96,8 +117,9 @@ async def process_alert(canary_token_id: str, payload: dict):
             except Exception as e:
                 logger.error(f"Geo lookup failed: {e}")
 
-        # Create trigger record
-        trigger = Trigger(
+        # Queue trigger record; the writer inserts bursts as one batch and
+        # updates token/drive timestamps and status alongside it
+        row = dict(
             token_id=token.id,
             source_ip=source_ip,
             user_agent=payload.get("useragent") or payload.get("user_agent"),
@@ -111,24 +133,9 @@ async def process_alert(canary_token_id: str, payload: dict):
             geo_org=geo_data.get("org"),
             additional_data=payload,
             raw_payload=payload,
-            triggered_at=datetime.utcnow(),
         )
-        db.add(trigger)
-
-        # Update token timestamps
-        now = datetime.utcnow()
-        if not token.first_triggered_at:
-            token.first_triggered_at = now
-        token.last_triggered_at = now
-
-        # Update drive status
-        drive = db.query(Drive).filter(Drive.id == token.drive_id).first()
-        if drive and drive.status in [DriveStatus.DEPLOYED, DriveStatus.PREPARED]:
-            drive.status = DriveStatus.TRIGGERED
-            if not drive.triggered_at:
-                drive.triggered_at = now
-
-        db.commit()
+        trigger_id, triggered_at = await trigger_writer.submit(row, drive_id=token.drive_id)
+        trigger = Trigger(id=trigger_id, triggered_at=triggered_at, **row)
 
         # Send Slack notification
         try:
@@ -145,6 +152,3 @@ async def process_alert(canary_token_id: str, payload: dict):
 
     except Exception as e:
         logger.error(f"Error processing alert: {e}")
-        db.rollback()
-    finally:
-        db.close()
@@ -1,8 +1,15 @@
 """Authentication service."""
 
+import hashlib
+import hmac
 import secrets
+import threading
+import time
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional
+from cachetools import TTLCache
+from fastapi import BackgroundTasks
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlalchemy.orm import Session
@@ -11,13 +18,46 @@ import logging
 from app.config import get_settings
 from app.database import SessionLocal
 from app.models.user import User, APIKey
+from app.services.cache_events import cache_events
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# JWT settings resolved once rather than on every encode/decode
+JWT_SECRET_KEY = settings.jwt_secret_key
+JWT_ALGORITHM = settings.jwt_algorithm
+JWT_ALGORITHMS = [JWT_ALGORITHM]
+ACCESS_TOKEN_TTL = timedelta(minutes=settings.jwt_access_token_expire_minutes)
+REFRESH_TOKEN_TTL = timedelta(days=settings.jwt_refresh_token_expire_days)
+
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Verified JWT payloads keyed by raw token. Clients resend the same bearer
+# token on every request, so this skips the signature check on repeats.
+# Only successful decodes are stored.
+_token_cache: TTLCache = TTLCache(maxsize=4096, ttl=60)
+_token_cache_lock = threading.Lock()
+
+# Verified API keys keyed by their hash: (key id, user id). Saves the lookup
+# query for agents that poll with one key.
+_api_key_cache: TTLCache = TTLCache(maxsize=1024, ttl=300)
+_api_key_cache_lock = threading.Lock()
+
+# Legacy bcrypt API key scans. Keys that already failed are remembered, and
+# concurrent requests with the same key wait for one scan instead of each
+# running it. Distinct keys scan in parallel up to LEGACY_SCAN_SLOTS; past
+# that, unknown keys are rejected without a scan rather than queued, so a
+# burst of bad keys cannot tie up the threadpool. Once a scan finds no
+# legacy hashes left the scan is skipped for good, since new keys are never
+# stored with bcrypt.
+LEGACY_SCAN_SLOTS = 2
+_legacy_key_misses: TTLCache = TTLCache(maxsize=10000, ttl=300)
+_legacy_scan_slots = threading.BoundedSemaphore(LEGACY_SCAN_SLOTS)
+_legacy_scans: dict[str, threading.Lock] = {}
+_legacy_scans_lock = threading.Lock()
+_legacy_keys_remain = True
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
@@ -32,32 +72,42 @@ def get_password_hash(password: str) -> str:
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.jwt_access_token_expire_minutes)
+    expire = datetime.utcnow() + (expires_delta or ACCESS_TOKEN_TTL)
     to_encode.update({"exp": expire, "type": "access"})
-    encoded_jwt = jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+    encoded_jwt = jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
     return encoded_jwt
 
 
 def create_refresh_token(data: dict) -> str:
     """Create a JWT refresh token."""
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(days=settings.jwt_refresh_token_expire_days)
+    expire = datetime.utcnow() + REFRESH_TOKEN_TTL
     to_encode.update({"exp": expire, "type": "refresh"})
-    encoded_jwt = jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+    encoded_jwt = jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
     return encoded_jwt
 
 
 def decode_token(token: str) -> Optional[dict]:
     """Decode and validate a JWT token."""
+    with _token_cache_lock:
+        payload = _token_cache.get(token)
+    if payload is not None:
+        # Never serve a cached payload past the token's own expiry
+        if payload.get("exp", 0) > time.time():
+            return payload
+        with _token_cache_lock:
+            _token_cache.pop(token, None)
+        return None
+
     try:
-        payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
-        return payload
+        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=JWT_ALGORITHMS)
     except JWTError:
         return None
 
+    with _token_cache_lock:
+        _token_cache[token] = payload
+    return payload
+
 
 def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
     """Authenticate a user by username and password."""
@@ -69,24 +119,149 @@ def authenticate_user(db: Session, username: str, password: str) -> Optional[Use
     return user
 
 
+def record_login(user_id):
+    """Record a successful login."""
+    db = SessionLocal()
+    try:
+        db.query(User).filter(User.id == user_id).update(
+            {User.last_login: datetime.utcnow()}, synchronize_session=False
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def hash_api_key(api_key: str) -> str:
+    """
+    Hash an API key for storage and lookup.
+
+    Keys carry 256 bits of randomness, so a keyed SHA-256 is enough; bcrypt's
+    work factor is for low-entropy passwords.
+    """
+    return hmac.new(
+        settings.api_key_pepper.encode(), api_key.encode(), hashlib.sha256
+    ).hexdigest()
+
+
 def generate_api_key() -> tuple[str, str]:
     """Generate a new API key. Returns (key, hash)."""
     key = f"usbdrop_{secrets.token_urlsafe(32)}"
-    key_hash = get_password_hash(key)
+    key_hash = hash_api_key(key)
     return key, key_hash
 
 
-def verify_api_key(db: Session, api_key: str) -> Optional[User]:
-    """Verify an API key and return the associated user."""
-    # Get all active API keys and check each
-    api_keys = db.query(APIKey).filter(APIKey.is_active == True).all()
-    for key_record in api_keys:
-        if verify_password(api_key, key_record.key_hash):
-            # Update last used
-            key_record.last_used = datetime.utcnow()
-            db.commit()
-            return key_record.user
-    return None
+def verify_api_key(
+    db: Session,
+    api_key: str,
+    background_tasks: Optional[BackgroundTasks] = None,
+) -> Optional[User]:
+    """
+    Verify an API key and return the associated user.
+
+    When background_tasks is given, last_used is recorded after the response
+    instead of inside the request.
+    """
+    user_id = verify_api_key_user_id(db, api_key, background_tasks)
+    if user_id is None:
+        return None
+    return db.get(User, user_id)
+
+
+def verify_api_key_user_id(
+    db: Session,
+    api_key: str,
+    background_tasks: Optional[BackgroundTasks] = None,
+) -> Optional[uuid.UUID]:
+    """Verify an API key and return the owning user's ID."""
+    digest = hash_api_key(api_key)
+    with _api_key_cache_lock:
+        cached = _api_key_cache.get(digest)
+
+    if cached is None:
+        key_record = db.query(APIKey).filter(
+            APIKey.key_hash == digest,
+            APIKey.is_active == True
+        ).first()
+        if key_record is None:
+            key_record = _upgrade_legacy_api_key(db, api_key, digest)
+        if key_record is None:
+            return None
+
+        cached = (key_record.id, key_record.user_id)
+        with _api_key_cache_lock:
+            _api_key_cache[digest] = cached
+
+    key_id, user_id = cached
+    if background_tasks is not None:
+        background_tasks.add_task(touch_api_key, key_id)
+    else:
+        touch_api_key(key_id)
+    return user_id
+
+
+def _upgrade_legacy_api_key(db: Session, api_key: str, digest: str) -> Optional[APIKey]:
+    """Match a key against bcrypt hashes from before keyed SHA-256, and rehash it."""
+    global _legacy_keys_remain
+    if not _legacy_keys_remain or digest in _legacy_key_misses:
+        return None
+
+    with _legacy_scans_lock:
+        scan_lock = _legacy_scans.setdefault(digest, threading.Lock())
+    try:
+        with scan_lock:
+            # A scan for the same key may have just finished
+            if not _legacy_keys_remain or digest in _legacy_key_misses:
+                return None
+            if not _legacy_scan_slots.acquire(blocking=False):
+                logger.warning("Legacy API key scans saturated; rejecting key")
+                return None
+            try:
+                legacy_keys = db.query(APIKey).filter(
+                    APIKey.is_active == True,
+                    APIKey.key_hash.startswith("$2")
+                ).all()
+                if not legacy_keys:
+                    _legacy_keys_remain = False
+                    return None
+
+                for key_record in legacy_keys:
+                    if verify_password(api_key, key_record.key_hash):
+                        key_record.key_hash = digest
+                        db.commit()
+                        return key_record
+
+                _legacy_key_misses[digest] = True
+                return None
+            finally:
+                _legacy_scan_slots.release()
+    finally:
+        with _legacy_scans_lock:
+            if _legacy_scans.get(digest) is scan_lock:
+                del _legacy_scans[digest]
+
+
+def touch_api_key(key_id):
+    """Record API key usage."""
+    db = SessionLocal()
+    try:
+        db.query(APIKey).filter(APIKey.id == key_id).update(
+            {APIKey.last_used: datetime.utcnow()}, synchronize_session=False
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def forget_api_key(key_id):
+    """Drop a revoked API key from the verification cache."""
+    with _api_key_cache_lock:
+        for digest, (cached_key_id, _) in list(_api_key_cache.items()):
+            if cached_key_id == key_id:
+                del _api_key_cache[digest]
+
+
+# Revocations published by other workers
+cache_events.on("api_key", lambda key_id: forget_api_key(uuid.UUID(key_id)))
 
 
 def create_initial_admin():
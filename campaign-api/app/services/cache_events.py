@@ -0,0 +1,98 @@
+"""Cross-worker cache invalidation over Postgres LISTEN/NOTIFY."""
+
+import logging
+import select
+import threading
+from typing import Callable, Dict
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "usbdrop_cache"
+
+
+def publish(db: Session, event: str, key: str):
+    """
+    Queue an invalidation for every worker.
+
+    NOTIFY is transactional, so the message goes out when the caller commits
+    and is dropped if it rolls back.
+    """
+    db.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": CHANNEL, "payload": f"{event}:{key}"},
+    )
+
+
+class CacheEventListener:
+    """
+    Background thread that LISTENs on the cache channel and dispatches each
+    notification to the handler registered for its event.
+
+    Each worker keeps its own in-process caches; this lets a revocation
+    handled by one worker evict entries in all of them.
+    """
+
+    def __init__(self):
+        self._handlers: Dict[str, Callable[[str], None]] = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def on(self, event: str, handler: Callable[[str], None]):
+        """Register the handler for an event name."""
+        self._handlers[event] = handler
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cache-events", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except Exception as e:
+                logger.error(f"Cache event listener failed, reconnecting: {e}")
+                self._stop.wait(5)
+
+    def _listen(self):
+        # A dedicated connection taken out of the pool for the listener's lifetime
+        pooled = engine.raw_connection()
+        conn = pooled.driver_connection
+        pooled.detach()
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {CHANNEL}")
+
+            while not self._stop.is_set():
+                if select.select([conn], [], [], 1.0) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    self._dispatch(conn.notifies.pop(0).payload)
+        finally:
+            conn.close()
+
+    def _dispatch(self, payload: str):
+        event, _, key = payload.partition(":")
+        handler = self._handlers.get(event)
+        if handler is None:
+            return
+        try:
+            handler(key)
+        except Exception as e:
+            logger.error(f"Cache event handler for {event} failed: {e}")
+
+
+cache_events = CacheEventListener()
@@ -1,5 +1,6 @@
 """CanaryTokens API client."""
 
+import asyncio
 import httpx
 from typing import Optional
 import logging
@@ -9,6 +10,35 @@ from app.config import get_settings
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Requests in flight to the canary server across the whole process;
+# per-call limits (e.g. in USBBuilder) don't add up across concurrent
+# requests, this does
+CANARY_MAX_IN_FLIGHT = 20
+
+# Shared by every CanaryTokensClient so keep-alive connections to the
+# canary server are reused across calls and requests
+_http_client: Optional[httpx.AsyncClient] = None
+_request_slots = asyncio.Semaphore(CANARY_MAX_IN_FLIGHT)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared HTTP client (application shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
 
 class CanaryTokensClient:
     """Client for interacting with self-hosted CanaryTokens API."""
@@ -16,7 +46,7 @@ class CanaryTokensClient:
     def __init__(self):
         self.server_url = settings.canary_server.rstrip("/")
         self.factory_auth = settings.factory_auth
-        self.timeout = 30.0
+        self.client = get_http_client()
 
     async def create_token(
         self,
@@ -53,10 +83,8 @@ class CanaryTokensClient:
 
         payload.update(kwargs)
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.post(url, json=payload)
-            response.raise_for_status()
-            return response.json()
+        response = await self._send("POST", url, json=payload)
+        return response.json()
 
     async def download_token(self, token_id: str) -> bytes:
         """
@@ -74,10 +102,8 @@ class CanaryTokensClient:
             "canarytoken": token_id,
         }
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            return response.content
+        response = await self._send("GET", url, params=params)
+        return response.content
 
     async def fetch_token(self, token_id: str) -> dict:
         """Fetch details of a Canarytoken."""
@@ -87,10 +113,8 @@ class CanaryTokensClient:
             "canarytoken": token_id,
         }
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            return response.json()
+        response = await self._send("GET", url, params=params)
+        return response.json()
 
     async def delete_token(self, token_id: str) -> dict:
         """Delete a Canarytoken."""
@@ -101,10 +125,15 @@ class CanaryTokensClient:
             "canarytoken": token_id,
         }
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.post(url, json=payload)
-            response.raise_for_status()
-            return response.json()
+        response = await self._send("POST", url, json=payload)
+        return response.json()
+
+    async def _send(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request once a process-wide slot is free."""
+        async with _request_slots:
+            response = await self.client.request(method, url, **kwargs)
+        response.raise_for_status()
+        return response
 
     async def create_dns_token(self, memo: str) -> dict:
         """Create a DNS token."""
@@ -1,13 +1,16 @@
 """Content generation service - OpenAI integration."""
 
+import asyncio
+import itertools
 import os
 import time
 from typing import Optional
-from datetime import datetime
 from sqlalchemy.orm import Session
+import aiofiles
 import httpx
 from openai import AsyncOpenAI
 import logging
+import orjson
 
 from app.config import get_settings
 from app.models.content import GeneratedContent
@@ -15,12 +18,78 @@ from app.models.content import GeneratedContent
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+DOCUMENT_MODEL = "gpt-4-turbo-preview"
+
+# Batch API statuses after which a batch will not change
+BATCH_FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+# Generation calls in flight across the whole process, so concurrent
+# generate-all requests don't overrun the OpenAI rate limit together
+OPENAI_MAX_IN_FLIGHT = 20
+
+# System prompts by document type, each with the content policy appended
+SYSTEM_PROMPT_POLICY = "\n\nIMPORTANT: All content must be appropriate for professional settings (G, PG, or PG-13 rated). Do not include any inappropriate, offensive, or explicit content."
+SYSTEM_PROMPTS = {
+    document_type: prompt + SYSTEM_PROMPT_POLICY
+    for document_type, prompt in {
+        "salary": "You are creating content for a confidential salary report. Include realistic but fictional employee names, salaries, bonuses, and compensation data. Make it look authentic.",
+        "hr": "You are creating content for an HR policy document. Include realistic policies, procedures, and guidelines that would be found in a corporate HR department.",
+        "financial": "You are creating content for a financial projection document. Include realistic revenue figures, expense categories, and budget allocations.",
+        "technical": "You are creating content for technical documentation. Include server configurations, credentials (use placeholder values), and infrastructure details.",
+        "general": "You are creating professional document content. Make it realistic and authentic-looking for a corporate environment.",
+    }.items()
+}
+
+# Shared by every ContentGenerator: the OpenAI client's default pool is too
+# small for concurrent generation requests, and image downloads reuse it too
+_http_client: Optional[httpx.AsyncClient] = None
+_openai_client: Optional[AsyncOpenAI] = None
+_generation_slots = asyncio.Semaphore(OPENAI_MAX_IN_FLIGHT)
+
+# Read size while streaming generated images to disk
+IMAGE_DOWNLOAD_CHUNK_BYTES = 64 * 1024
+
+# Suffix that keeps upload names unique when several land in one second
+# (a batch saves all its documents together)
+_upload_counter = itertools.count()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(60.0, connect=5.0),
+            limits=httpx.Limits(max_keepalive_connections=50, max_connections=200),
+        )
+    return _http_client
+
+
+def get_openai_client() -> AsyncOpenAI:
+    """Return the shared OpenAI client, creating it on first use."""
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            http_client=get_http_client(),
+        )
+    return _openai_client
+
+
+async def close_http_client():
+    """Close the shared HTTP client (application shutdown)."""
+    global _http_client, _openai_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+        _openai_client = None
+
 
 class ContentGenerator:
     """Service for generating content using OpenAI APIs."""
 
     def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.openai_api_key)
+        self.client = get_openai_client()
         self.uploads_dir = "uploads/generated"
         os.makedirs(self.uploads_dir, exist_ok=True)
 
@@ -40,53 +109,156 @@ class ContentGenerator:
         """
         start_time = time.time()
 
-        # Build system prompt based on document type
-        system_prompts = {
-            "salary": "You are creating content for a confidential salary report. Include realistic but fictional employee names, salaries, bonuses, and compensation data. Make it look authentic.",
-            "hr": "You are creating content for an HR policy document. Include realistic policies, procedures, and guidelines that would be found in a corporate HR department.",
-            "financial": "You are creating content for a financial projection document. Include realistic revenue figures, expense categories, and budget allocations.",
-            "technical": "You are creating content for technical documentation. Include server configurations, credentials (use placeholder values), and infrastructure details.",
-            "general": "You are creating professional document content. Make it realistic and authentic-looking for a corporate environment.",
-        }
+        # Generate content
+        async with _generation_slots:
+            response = await self.client.chat.completions.create(
+                **self._document_request(prompt, document_type)
+            )
 
-        system_prompt = system_prompts.get(document_type, system_prompts["general"])
-        system_prompt += "\n\nIMPORTANT: All content must be appropriate for professional settings (G, PG, or PG-13 rated). Do not include any inappropriate, offensive, or explicit content."
+        content = await self._save_document(
+            generated_text=response.choices[0].message.content,
+            tokens_used=response.usage.total_tokens,
+            generation_time=int((time.time() - start_time) * 1000),
+            prompt=prompt,
+            document_type=document_type,
+            filename=filename,
+            profile_id=profile_id,
+        )
 
-        # Generate content
-        response = await self.client.chat.completions.create(
-            model="gpt-4-turbo-preview",
-            messages=[
+        if db:
+            db.add(content)
+            db.commit()
+            db.refresh(content)
+
+        return content
+
+    async def submit_documents_batch(self, jobs: list[dict]) -> str:
+        """
+        Submit documents to the OpenAI Batch API.
+
+        Batched requests cost half as much but may take up to the 24h
+        completion window, so this is for bulk preparation, not interactive
+        requests. Each job has "prompt", "type" and "filename" keys, as in a
+        profile's ai_prompts.
+
+        Returns:
+            The batch id, for collect_documents_batch()
+        """
+        lines = [
+            orjson.dumps({
+                "custom_id": str(index),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": self._document_request(job.get("prompt", ""), job.get("type", "general")),
+            })
+            for index, job in enumerate(jobs)
+        ]
+        batch_file = await self.client.files.create(
+            file=("documents.jsonl", b"\n".join(lines)),
+            purpose="batch",
+        )
+        batch = await self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        logger.info(f"Submitted document batch {batch.id} with {len(jobs)} requests")
+        return batch.id
+
+    async def collect_documents_batch(
+        self,
+        batch_id: str,
+        jobs: list[dict],
+        profile_id: Optional[str] = None,
+    ) -> Optional[tuple[str, list[GeneratedContent]]]:
+        """
+        Check a submitted batch and save its documents if it has finished.
+
+        jobs must be the list passed to submit_documents_batch(). Jobs that
+        fail are logged and left out.
+
+        Returns:
+            None while the batch is still running, else (final status,
+            documents); documents is empty unless the status is "completed"
+        """
+        batch = await self.client.batches.retrieve(batch_id)
+        if batch.status not in BATCH_FINAL_STATUSES:
+            return None
+
+        if batch.status != "completed" or not batch.output_file_id:
+            logger.error(f"Document batch {batch_id} ended with status {batch.status}")
+            return batch.status, []
+
+        output = await self.client.files.content(batch.output_file_id)
+        generation_time = int((time.time() - batch.created_at) * 1000)
+
+        contents = []
+        for line in output.content.splitlines():
+            if not line:
+                continue
+            result = orjson.loads(line)
+            job = jobs[int(result["custom_id"])]
+            response = result.get("response") or {}
+            if response.get("status_code") != 200:
+                logger.error(f"Batch document {job.get('filename')} failed: {result.get('error') or response}")
+                continue
+
+            body = response["body"]
+            contents.append(await self._save_document(
+                generated_text=body["choices"][0]["message"]["content"],
+                tokens_used=body["usage"]["total_tokens"],
+                generation_time=generation_time,
+                prompt=job.get("prompt", ""),
+                document_type=job.get("type", "general"),
+                filename=job.get("filename", "document.docx"),
+                profile_id=profile_id,
+            ))
+
+        return batch.status, contents
+
+    def _document_request(self, prompt: str, document_type: str) -> dict:
+        """Build the chat completion parameters for a document."""
+        system_prompt = SYSTEM_PROMPTS.get(document_type, SYSTEM_PROMPTS["general"])
+
+        return {
+            "model": DOCUMENT_MODEL,
+            "messages": [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": prompt},
             ],
-            max_tokens=2000,
-            temperature=0.7,
-        )
-
-        generated_text = response.choices[0].message.content
-        tokens_used = response.usage.total_tokens
+            "max_tokens": 2000,
+            "temperature": 0.7,
+        }
 
+    async def _save_document(
+        self,
+        generated_text: str,
+        tokens_used: int,
+        generation_time: int,
+        prompt: str,
+        document_type: str,
+        filename: str,
+        profile_id: Optional[str],
+    ) -> GeneratedContent:
+        """Write generated document text to uploads and build its record."""
         # Save to file
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        safe_filename = f"{timestamp}_{filename.replace('.docx', '.txt').replace('.xlsx', '.txt')}"
-        file_path = os.path.join(self.uploads_dir, safe_filename)
+        file_path = self._upload_path(filename.replace('.docx', '.txt').replace('.xlsx', '.txt'))
 
-        with open(file_path, "w") as f:
-            f.write(generated_text)
-
-        generation_time = int((time.time() - start_time) * 1000)
+        data = generated_text.encode("utf-8")
+        async with aiofiles.open(file_path, "wb") as f:
+            await f.write(data)
 
         # Create database record
-        content = GeneratedContent(
+        return GeneratedContent(
             profile_id=profile_id,
             content_type="document",
             prompt=prompt,
-            model_used="gpt-4-turbo-preview",
+            model_used=DOCUMENT_MODEL,
             filename=filename,
             file_path=file_path,
-            file_size_bytes=len(generated_text.encode("utf-8")),
+            file_size_bytes=len(data),
             mime_type="text/plain",
-            metadata={
+            content_metadata={
                 "document_type": document_type,
                 "original_filename": filename,
             },
@@ -94,12 +266,11 @@ class ContentGenerator:
             generation_time_ms=generation_time,
         )
 
-        if db:
-            db.add(content)
-            db.commit()
-            db.refresh(content)
-
-        return content
+    def _upload_path(self, filename: str) -> str:
+        """Return a unique path under the uploads directory for filename."""
+        return os.path.join(
+            self.uploads_dir, f"{int(time.time())}_{next(_upload_counter)}_{filename}"
+        )
 
     async def generate_image(
         self,
@@ -119,30 +290,29 @@ class ContentGenerator:
         safe_prompt = f"{prompt}\n\nStyle: Professional, appropriate for corporate/business settings. Must be G, PG, or PG-13 rated."
 
         # Generate image
-        response = await self.client.images.generate(
-            model="dall-e-3",
-            prompt=safe_prompt,
-            size=size,
-            quality="standard",
-            style=style,
-            n=1,
-        )
+        async with _generation_slots:
+            response = await self.client.images.generate(
+                model="dall-e-3",
+                prompt=safe_prompt,
+                size=size,
+                quality="standard",
+                style=style,
+                n=1,
+            )
 
         image_url = response.data[0].url
         revised_prompt = response.data[0].revised_prompt
 
-        # Download image
-        async with httpx.AsyncClient() as client:
-            img_response = await client.get(image_url)
-            image_data = img_response.content
-
-        # Save to file
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        safe_filename = f"{timestamp}_{filename}"
-        file_path = os.path.join(self.uploads_dir, safe_filename)
+        # Stream the image to file without holding all of it in memory
+        file_path = self._upload_path(filename)
+        file_size = 0
 
-        with open(file_path, "wb") as f:
-            f.write(image_data)
+        async with get_http_client().stream("GET", image_url) as img_response:
+            img_response.raise_for_status()
+            async with aiofiles.open(file_path, "wb") as f:
+                async for chunk in img_response.aiter_bytes(IMAGE_DOWNLOAD_CHUNK_BYTES):
+                    await f.write(chunk)
+                    file_size += len(chunk)
 
         generation_time = int((time.time() - start_time) * 1000)
 
@@ -154,9 +324,9 @@ class ContentGenerator:
             model_used="dall-e-3",
             filename=filename,
             file_path=file_path,
-            file_size_bytes=len(image_data),
+            file_size_bytes=file_size,
             mime_type="image/png",
-            metadata={
+            content_metadata={
                 "size": size,
                 "style": style,
                 "revised_prompt": revised_prompt,
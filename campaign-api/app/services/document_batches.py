@@ -0,0 +1,120 @@
+"""Polls OpenAI document batches and stores their results."""
+
+import asyncio
+import logging
+import os
+from typing import List, Tuple
+
+from sqlalchemy import func, update
+from starlette.concurrency import run_in_threadpool
+
+from app.database import SessionLocal
+from app.models.content import GeneratedContent
+from app.models.document_batch import DocumentBatch
+from app.services.content_generator import ContentGenerator
+
+logger = logging.getLogger(__name__)
+
+# Batches take minutes to hours; checking each once a minute is plenty
+BATCH_POLL_INTERVAL_SECONDS = 60
+
+
+class DocumentBatchPoller:
+    """
+    Background task that finishes document batches recorded in the database.
+
+    Pending batches are read from document_batches on every pass, so a
+    batch submitted before a restart or deploy is picked up again. With
+    several workers polling, the first to mark a batch finished stores its
+    documents; the others discard theirs.
+    """
+
+    def __init__(self, interval_seconds: float):
+        self.interval = interval_seconds
+        self._task = None
+
+    def start(self):
+        """Start polling on the running event loop."""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop polling; unfinished batches stay pending for the next start."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.poll()
+            except Exception as e:
+                logger.error(f"Document batch poll failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def poll(self):
+        """Check every pending batch once, storing any that have finished."""
+        pending = await run_in_threadpool(_pending_batches)
+        if not pending:
+            return
+
+        generator = ContentGenerator()
+        for batch_id, profile_id, jobs in pending:
+            try:
+                outcome = await generator.collect_documents_batch(batch_id, jobs, profile_id=profile_id)
+            except Exception as e:
+                logger.error(f"Failed to check document batch {batch_id}: {e}")
+                continue
+            if outcome is None:
+                continue
+
+            status, contents = outcome
+            if await run_in_threadpool(_finish_batch, batch_id, status, contents):
+                logger.info(f"Stored {len(contents)} documents from batch {batch_id}")
+            else:
+                # Another worker finished it first; drop the duplicate files
+                for content in contents:
+                    try:
+                        os.remove(content.file_path)
+                    except OSError:
+                        pass
+
+
+def _pending_batches() -> List[Tuple]:
+    db = SessionLocal()
+    try:
+        return db.query(
+            DocumentBatch.id, DocumentBatch.profile_id, DocumentBatch.jobs
+        ).filter(DocumentBatch.status == "pending").order_by(DocumentBatch.created_at).all()
+    finally:
+        db.close()
+
+
+def _finish_batch(batch_id: str, status: str, contents: List[GeneratedContent]) -> bool:
+    """Mark a batch finished and save its documents, unless already done."""
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            update(DocumentBatch)
+            .where(DocumentBatch.id == batch_id, DocumentBatch.status == "pending")
+            .values(status=status, finished_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            db.rollback()
+            return False
+        db.add_all(contents)
+        db.commit()
+        return True
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+document_batch_poller = DocumentBatchPoller(interval_seconds=BATCH_POLL_INTERVAL_SECONDS)
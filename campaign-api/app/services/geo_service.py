@@ -1,19 +1,92 @@
 """Geolocation service for IP lookups."""
 
+import asyncio
+import time
+from collections import deque
 import httpx
+from cachetools import TTLCache
 from typing import Optional
 import logging
+import orjson
+
+from app.config import get_settings
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+GEO_FIELDS = "status,country,countryCode,region,regionName,city,lat,lon,isp,org"
+LOCAL_ADDRESSES = ("127.0.0.1", "::1", "localhost")
+
+# Maximum addresses per request to the batch endpoint
+GEO_BATCH_SIZE = 100
+
+# ip-api.com free tier request limits per minute. Over budget, lookups are
+# skipped (the trigger is stored without geo data) rather than sent and
+# answered with 429, which gets the server's address throttled.
+GEO_SINGLE_PER_MINUTE = 45
+GEO_BATCH_PER_MINUTE = 15
+
+# Requests in flight at once; bounds connections, not the request rate
+GEO_LOOKUP_CONCURRENCY = 20
+
+# Shared by every GeoService so lookups reuse keep-alive connections
+_http_client: Optional[httpx.AsyncClient] = None
+_lookup_slots = asyncio.Semaphore(GEO_LOOKUP_CONCURRENCY)
+
+
+class _MinuteBudget:
+    """Sliding one-minute request budget for one ip-api.com endpoint."""
+
+    def __init__(self, per_minute: int):
+        self.per_minute = per_minute
+        self._sent: deque[float] = deque()
+
+    def take(self) -> bool:
+        """Spend one request if the last minute has room for it."""
+        now = time.monotonic()
+        while self._sent and now - self._sent[0] >= 60:
+            self._sent.popleft()
+        if len(self._sent) >= self.per_minute:
+            return False
+        self._sent.append(now)
+        return True
+
+
+_single_budget = _MinuteBudget(GEO_SINGLE_PER_MINUTE)
+_batch_budget = _MinuteBudget(GEO_BATCH_PER_MINUTE)
+
+# Successful lookups by IP. Repeat triggers usually come from the same
+# office or VPN addresses, and their location rarely changes within a day.
+_geo_cache: TTLCache = TTLCache(maxsize=10_000, ttl=settings.geo_cache_ttl_seconds)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=5.0,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared HTTP client (application shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
 
 
 class GeoService:
     """Service for IP geolocation lookups."""
 
     def __init__(self):
-        # Using ip-api.com (free tier: 45 requests/minute)
+        # Using ip-api.com (free tier, see GEO_*_PER_MINUTE)
         self.api_url = "http://ip-api.com/json"
-        self.timeout = 5.0
+        self.batch_url = "http://ip-api.com/batch"
+        self.client = get_http_client()
 
     async def lookup(self, ip_address: str) -> dict:
         """
@@ -22,32 +95,25 @@ class GeoService:
         Returns:
             Dictionary with location data or empty dict on failure
         """
-        if not ip_address or ip_address in ["127.0.0.1", "::1", "localhost"]:
+        if not ip_address or ip_address in LOCAL_ADDRESSES:
+            return {}
+
+        cached = _geo_cache.get(ip_address)
+        if cached is not None:
+            return cached
+
+        if not _single_budget.take():
+            logger.warning(f"Geo lookup skipped for {ip_address}: rate limit reached")
             return {}
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
+            async with _lookup_slots:
+                response = await self.client.get(
                     f"{self.api_url}/{ip_address}",
-                    params={"fields": "status,country,countryCode,region,regionName,city,lat,lon,isp,org"},
+                    params={"fields": GEO_FIELDS},
                 )
-                response.raise_for_status()
-                data = response.json()
-
-                if data.get("status") != "success":
-                    logger.warning(f"Geo lookup failed for {ip_address}: {data}")
-                    return {}
-
-                return {
-                    "country": data.get("country"),
-                    "country_code": data.get("countryCode"),
-                    "region": data.get("regionName"),
-                    "city": data.get("city"),
-                    "latitude": data.get("lat"),
-                    "longitude": data.get("lon"),
-                    "isp": data.get("isp"),
-                    "org": data.get("org"),
-                }
+            response.raise_for_status()
+            return _to_geo(ip_address, orjson.loads(response.content))
 
         except Exception as e:
             logger.error(f"Geo lookup error for {ip_address}: {e}")
@@ -57,10 +123,67 @@ class GeoService:
         """
         Look up geolocation for multiple IP addresses.
 
+        Cached addresses are answered from memory; the rest go to the batch
+        endpoint, GEO_BATCH_SIZE per request.
+
         Returns:
             Dictionary mapping IP addresses to their geo data
         """
         results = {}
-        for ip in ip_addresses:
-            results[ip] = await self.lookup(ip)
+        misses = []
+        for ip in dict.fromkeys(ip_addresses):
+            if not ip or ip in LOCAL_ADDRESSES:
+                results[ip] = {}
+            elif (cached := _geo_cache.get(ip)) is not None:
+                results[ip] = cached
+            else:
+                misses.append(ip)
+
+        chunks = [misses[i:i + GEO_BATCH_SIZE] for i in range(0, len(misses), GEO_BATCH_SIZE)]
+        for chunk_results in await asyncio.gather(*(self._batch_chunk(chunk) for chunk in chunks)):
+            results.update(chunk_results)
         return results
+
+    async def _batch_chunk(self, ip_addresses: list[str]) -> dict[str, dict]:
+        """Look up one batch-endpoint request's worth of addresses."""
+        if not _batch_budget.take():
+            logger.warning(f"Geo batch lookup skipped for {len(ip_addresses)} addresses: rate limit reached")
+            return {ip: {} for ip in ip_addresses}
+
+        try:
+            async with _lookup_slots:
+                response = await self.client.post(
+                    self.batch_url,
+                    content=orjson.dumps([{"query": ip, "fields": GEO_FIELDS} for ip in ip_addresses]),
+                    headers={"Content-Type": "application/json"},
+                )
+            response.raise_for_status()
+            # Answers come back in request order
+            return {
+                ip: _to_geo(ip, data)
+                for ip, data in zip(ip_addresses, orjson.loads(response.content))
+            }
+
+        except Exception as e:
+            logger.error(f"Geo batch lookup error for {len(ip_addresses)} addresses: {e}")
+            return {ip: {} for ip in ip_addresses}
+
+
+def _to_geo(ip_address: str, data: dict) -> dict:
+    """Map an ip-api.com answer to our geo fields, caching successes."""
+    if data.get("status") != "success":
+        logger.warning(f"Geo lookup failed for {ip_address}: {data}")
+        return {}
+
+    geo = {
+        "country": data.get("country"),
+        "country_code": data.get("countryCode"),
+        "region": data.get("regionName"),
+        "city": data.get("city"),
+        "latitude": data.get("lat"),
+        "longitude": data.get("lon"),
+        "isp": data.get("isp"),
+        "org": data.get("org"),
+    }
+    _geo_cache[ip_address] = geo
+    return geo
@@ -3,6 +3,7 @@
 import httpx
 from typing import Optional
 import logging
+import orjson
 
 from app.config import get_settings
 from app.models.token import Token
@@ -33,7 +34,11 @@ class SlackNotifier:
 
         try:
             async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(self.webhook_url, json=payload)
+                response = await client.post(
+                    self.webhook_url,
+                    content=orjson.dumps(payload),
+                    headers={"Content-Type": "application/json"},
+                )
                 response.raise_for_status()
         except Exception as e:
             logger.error(f"Failed to send Slack notification: {e}")
@@ -128,7 +133,12 @@ class SlackNotifier:
             text=f"🚨 Token triggered: {drive.unique_code if drive else 'Unknown'} - {token.token_type}",
         )
 
-    async def send_deployment_alert(self, drive: Drive, location_name: str = None):
+    async def send_deployment_alert(
+        self,
+        drive: Drive,
+        location_name: str = None,
+        campaign_name: Optional[str] = None,
+    ):
         """Send an alert when a drive is deployed."""
         if not self.enabled:
             return
@@ -159,7 +169,7 @@ class SlackNotifier:
                     },
                     {
                         "type": "mrkdwn",
-                        "text": f"*Campaign:*\n{drive.campaign.name if drive.campaign else 'Unknown'}"
+                        "text": f"*Campaign:*\n{campaign_name or 'Unknown'}"
                     },
                 ]
             },
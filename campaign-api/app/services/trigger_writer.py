@@ -0,0 +1,178 @@
+"""Batched trigger inserts for webhook bursts."""
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, insert, update
+from starlette.concurrency import run_in_threadpool
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.drive import Drive, DriveStatus
+from app.models.token import Token
+from app.models.trigger import Trigger
+from app.routers.alerts import invalidate_alert_stats
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Queued by stop() to end the flush loop after the batch in hand
+_STOP = object()
+
+
+class TriggerWriter:
+    """
+    Collects trigger rows from webhook handlers and writes them in batches.
+
+    Each flush is one multi-row INSERT plus one UPDATE for tokens and one
+    for drives, so a trigger storm costs a few round-trips per batch
+    instead of several per event. Ids and the trigger time are assigned
+    here rather than by the database, so the INSERT needs no RETURNING.
+    """
+
+    def __init__(self, window_ms: int, max_batch: int):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the flush loop on the running event loop."""
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush anything still queued and stop the flush loop."""
+        if self._task is None:
+            return
+        # The loop is told to stop rather than cancelled, so the batch it is
+        # collecting or writing is flushed and every waiting submit() resolves
+        await self._queue.put(_STOP)
+        await self._task
+        pending = []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        if pending:
+            await self._flush(pending)
+        self._task = None
+        self._queue = None
+
+    async def submit(self, row: dict, drive_id) -> Tuple:
+        """
+        Queue a trigger row and wait for it to be written.
+
+        Returns:
+            (trigger id, triggered_at) once the batch has committed
+        """
+        future = asyncio.get_running_loop().create_future()
+        item = (row, drive_id, future)
+        if self._queue is None:
+            # Writer not running (scripts, shells): write straight away
+            await self._flush([item])
+        else:
+            await self._queue.put(item)
+        return await future
+
+    async def _run(self):
+        while True:
+            item = await self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            stopping = False
+            deadline = asyncio.get_running_loop().time() + self.window
+            while len(batch) < self.max_batch:
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+            if stopping:
+                return
+
+    async def _flush(self, batch: List[Tuple]):
+        # The database work runs in the threadpool; futures are resolved
+        # back here on the event loop
+        try:
+            written = await run_in_threadpool(self._write, batch)
+        except Exception as e:
+            if len(batch) > 1:
+                # One bad row (say, an unparsable source_ip) fails the whole
+                # INSERT; retry row by row so only that trigger is lost
+                logger.warning(f"Failed to write {len(batch)} triggers, retrying one by one: {e}")
+                for item in batch:
+                    await self._flush([item])
+                return
+            logger.error(f"Failed to write trigger: {e}")
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        invalidate_alert_stats()
+
+        for (_, _, future), (trigger_id, triggered_at) in zip(batch, written):
+            if not future.done():
+                future.set_result((trigger_id, triggered_at))
+
+    def _write(self, batch: List[Tuple]) -> List[Tuple]:
+        # One timestamp for the batch, as now() was per transaction
+        now = datetime.now(timezone.utc)
+        rows = [
+            {**row, "id": uuid.uuid4(), "triggered_at": now}
+            for row, _, _ in batch
+        ]
+        token_ids = {row["token_id"] for row in rows}
+        drive_ids = {drive_id for _, drive_id, _ in batch if drive_id}
+
+        db = SessionLocal()
+        try:
+            # Against the table, as in prepare_drive: with every value
+            # supplied this is a single multi-row INSERT
+            db.execute(insert(Trigger.__table__), rows)
+
+            db.execute(
+                update(Token)
+                .where(Token.id.in_(token_ids))
+                .values(
+                    first_triggered_at=func.coalesce(Token.first_triggered_at, now),
+                    last_triggered_at=now,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            if drive_ids:
+                db.execute(
+                    update(Drive)
+                    .where(
+                        Drive.id.in_(drive_ids),
+                        Drive.status.in_([DriveStatus.DEPLOYED, DriveStatus.PREPARED]),
+                    )
+                    .values(
+                        status=DriveStatus.TRIGGERED,
+                        triggered_at=func.coalesce(Drive.triggered_at, now),
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+            db.commit()
+            return [(row["id"], now) for row in rows]
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+trigger_writer = TriggerWriter(
+    window_ms=settings.trigger_batch_window_ms,
+    max_batch=settings.trigger_batch_max_size,
+)
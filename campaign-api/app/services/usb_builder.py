@@ -1,11 +1,14 @@
 """USB Drive builder service - creates tokens and prepares ZIP files."""
 
+import asyncio
 import os
 import io
 import zipfile
 from datetime import datetime
-from typing import Optional
+from typing import AsyncIterator, Optional
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 import logging
 
 from app.models.drive import Drive
@@ -29,6 +32,46 @@ TOKEN_EXTENSIONS = {
     "wireguard": ".conf",
 }
 
+# Token types whose file body is downloaded from the canary server
+DOCUMENT_TOKEN_TYPES = ("doc-msword", "doc-msexcel", "pdf-acrobat-reader", "qr-code")
+
+# Generated text entries are deflated at the cheapest level; anything more
+# buys nothing on files this small
+TEXT_COMPRESSION = {"compress_type": zipfile.ZIP_DEFLATED, "compresslevel": 1}
+
+# Canary API calls in flight per drive (prepare and ZIP download)
+CANARY_CONCURRENCY = 8
+
+# Landing-page redirect URLs by theme; the domain is fixed for the process
+_LANDING_BASE_URL = "https://rick." + settings.canary_domain.replace(
+    "subproject55.com", "becomeaninternetghost.com"
+)
+REDIRECT_THEME_URLS = {
+    "rickroll": f"{_LANDING_BASE_URL}/direct",
+    "corporate": f"{_LANDING_BASE_URL}/corporate",
+    "login": f"{_LANDING_BASE_URL}/login",
+    "maintenance": f"{_LANDING_BASE_URL}/maintenance",
+}
+
+
+class _ZipSink(io.RawIOBase):
+    """Write-only, unseekable buffer that zipfile streams into."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
 
 class USBBuilder:
     """Service for building USB drive content."""
@@ -45,38 +88,70 @@ class USBBuilder:
         Returns:
             Files manifest dictionary
         """
-        token_config = profile.token_config or {}
         file_structure = profile.file_structure or {}
 
-        files = []
-        total_size = 0
-
         # Create folders
         folders = file_structure.get("folders", [])
 
-        # Process file definitions
-        for file_def in file_structure.get("files", []):
-            filename = file_def.get("name", "")
-            folder = file_def.get("folder", "")
-            token_type = file_def.get("type", "")
-            redirect_theme = file_def.get("redirect_theme", "")
+        # Create tokens and fetch their documents for all files at once;
+        # results come back in file order
+        semaphore = asyncio.Semaphore(CANARY_CONCURRENCY)
+        results = await asyncio.gather(*(
+            self._build_file(drive, file_def, semaphore)
+            for file_def in file_structure.get("files", [])
+        ))
+        results = [result for result in results if result]
+
+        # One multi-row INSERT. Against the table, not the mapper: the ORM
+        # inserts objects with server-generated ids row by row, and its bulk
+        # path splits rows into batches by which values are None.
+        if results:
+            self.db.execute(insert(Token.__table__), [row for row, _ in results])
+        self.db.commit()
 
-            if not filename or not token_type:
-                continue
+        files = [entry for _, entry in results]
+        return {
+            "folders": folders,
+            "files": files,
+            "total_size_bytes": sum(entry["size_bytes"] for entry in files),
+            "file_count": len(files),
+            "prepared_at": datetime.utcnow().isoformat(),
+        }
+
+    async def _build_file(
+        self,
+        drive: Drive,
+        file_def: dict,
+        semaphore: asyncio.Semaphore,
+    ) -> Optional[tuple[dict, dict]]:
+        """
+        Create the token for one profile file and fetch its document.
+
+        Returns:
+            (tokens row, manifest entry), or None if the file is skipped
+        """
+        filename = file_def.get("name", "")
+        folder = file_def.get("folder", "")
+        token_type = file_def.get("type", "")
+        redirect_theme = file_def.get("redirect_theme", "")
 
-            # Build file path
-            file_path = f"{folder}/{filename}" if folder else filename
+        if not filename or not token_type:
+            return None
+
+        # Build file path
+        file_path = f"{folder}/{filename}" if folder else filename
 
-            # Create memo for this token
-            memo = f"{drive.unique_code}|{file_path}"
+        # Create memo for this token
+        memo = f"{drive.unique_code}|{file_path}"
 
-            # Determine redirect URL
-            redirect_url = None
-            if redirect_theme:
-                redirect_url = self._get_redirect_url(redirect_theme)
+        # Determine redirect URL
+        redirect_url = None
+        if redirect_theme:
+            redirect_url = self._get_redirect_url(redirect_theme)
 
-            # Create the token
-            try:
+        # Create the token
+        try:
+            async with semaphore:
                 result = await self._create_token(
                     token_type=token_type,
                     memo=memo,
@@ -85,62 +160,49 @@ class USBBuilder:
 
                 if not result:
                     logger.error(f"Failed to create token for {file_path}")
-                    continue
+                    return None
 
                 # Extract token data
                 canary_data = result.get("canarytoken", {})
                 canary_token_id = canary_data.get("canarytoken", "")
                 token_url = canary_data.get("url", "") or canary_data.get("hostname", "")
 
-                # Create token record
-                token = Token(
-                    drive_id=drive.id,
-                    canary_token_id=canary_token_id,
-                    token_type=token_type,
-                    filename=filename,
-                    file_path=file_path,
-                    memo=memo,
-                    url=token_url,
-                    redirect_url=redirect_url,
-                    redirect_theme=redirect_theme,
-                    aws_access_key_id=canary_data.get("access_key_id"),
-                    aws_secret_access_key=canary_data.get("secret_access_key"),
-                )
-                self.db.add(token)
-
                 # Download file content for document tokens
                 file_content = None
-                if token_type in ["doc-msword", "doc-msexcel", "pdf-acrobat-reader", "qr-code"]:
+                if token_type in DOCUMENT_TOKEN_TYPES:
                     try:
                         file_content = await self.canary_client.download_token(canary_token_id)
                     except Exception as e:
                         logger.error(f"Failed to download token file: {e}")
 
-                file_size = len(file_content) if file_content else 0
-                total_size += file_size
-
-                files.append({
-                    "path": file_path,
-                    "token_id": canary_token_id,
-                    "token_type": token_type,
-                    "size_bytes": file_size,
-                    "created_at": datetime.utcnow().isoformat(),
-                    "has_content": file_content is not None,
-                })
+            # Token record
+            token = {
+                "drive_id": drive.id,
+                "campaign_id": drive.campaign_id,
+                "canary_token_id": canary_token_id,
+                "token_type": token_type,
+                "filename": filename,
+                "file_path": file_path,
+                "memo": memo,
+                "url": token_url,
+                "redirect_url": redirect_url,
+                "redirect_theme": redirect_theme,
+                "aws_access_key_id": canary_data.get("access_key_id"),
+                "aws_secret_access_key": canary_data.get("secret_access_key"),
+            }
+
+            return token, {
+                "path": file_path,
+                "token_id": canary_token_id,
+                "token_type": token_type,
+                "size_bytes": len(file_content) if file_content else 0,
+                "created_at": datetime.utcnow().isoformat(),
+                "has_content": file_content is not None,
+            }
 
-            except Exception as e:
-                logger.error(f"Error creating token for {file_path}: {e}")
-                continue
-
-        self.db.commit()
-
-        return {
-            "folders": folders,
-            "files": files,
-            "total_size_bytes": total_size,
-            "file_count": len(files),
-            "prepared_at": datetime.utcnow().isoformat(),
-        }
+        except Exception as e:
+            logger.error(f"Error creating token for {file_path}: {e}")
+            return None
 
     async def _create_token(
         self,
@@ -175,76 +237,103 @@ class USBBuilder:
 
     def _get_redirect_url(self, theme: str) -> str:
         """Get redirect URL based on theme."""
-        app_domain = settings.canary_domain.replace("subproject55.com", "becomeaninternetghost.com")
-        base_url = f"https://rick.{app_domain}"
-
-        theme_urls = {
-            "rickroll": f"{base_url}/direct",
-            "corporate": f"{base_url}/corporate",
-            "login": f"{base_url}/login",
-            "maintenance": f"{base_url}/maintenance",
+        return REDIRECT_THEME_URLS.get(theme, REDIRECT_THEME_URLS["rickroll"])
+
+    def stream_zip(self, drive: Drive) -> AsyncIterator[bytes]:
+        """
+        Stream a ZIP file containing all drive files.
+
+        Database lookups happen here, before the response starts; the
+        returned generator only fetches token documents and emits archive
+        bytes as each file is written.
+        """
+        tokens = {
+            token.canary_token_id: token
+            for token in self.db.query(Token).filter(Token.drive_id == drive.id)
         }
+        readme_content = self._create_readme(drive)
+        return self._zip_chunks(drive.files_manifest or {}, tokens, readme_content)
+
+    async def _zip_chunks(
+        self,
+        manifest: dict,
+        tokens: dict,
+        readme_content: str,
+    ) -> AsyncIterator[bytes]:
+        files = manifest.get("files", [])
+
+        # Start every document download up front. The loop below awaits them
+        # in file order, so later downloads overlap earlier writes.
+        semaphore = asyncio.Semaphore(CANARY_CONCURRENCY)
+
+        async def download(token_id: str) -> bytes:
+            async with semaphore:
+                return await self.canary_client.download_token(token_id)
+
+        downloads = {
+            file_info["token_id"]: asyncio.create_task(download(file_info["token_id"]))
+            for file_info in files
+            if file_info.get("path") and file_info.get("token_id")
+            and file_info.get("token_type") in DOCUMENT_TOKEN_TYPES
+        }
+
+        sink = _ZipSink()
+        try:
+            # Entries default to stored; token documents are already compressed
+            with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED) as zf:
+                # Create folders
+                for folder in manifest.get("folders", []):
+                    zf.writestr(f"{folder}/", "")
+                yield sink.drain()
+
+                # Add files
+                for file_info in files:
+                    file_path = file_info.get("path", "")
+                    token_id = file_info.get("token_id", "")
+                    token_type = file_info.get("token_type", "")
+
+                    if not file_path or not token_id:
+                        continue
+
+                    try:
+                        # Get file content
+                        if token_type in DOCUMENT_TOKEN_TYPES:
+                            content = await downloads[token_id]
+                            # CRC and copy of document bodies run off the event loop
+                            await run_in_threadpool(zf.writestr, file_path, content)
+
+                        elif token_type == "windows-dir":
+                            # Create desktop.ini for folder token
+                            token = tokens.get(token_id)
+                            if token and token.url:
+                                ini_content = self._create_desktop_ini(token.url)
+                                zf.writestr(file_path, ini_content, **TEXT_COMPRESSION)
+
+                        elif token_type == "aws-id":
+                            # Create AWS credentials file
+                            token = tokens.get(token_id)
+                            if token:
+                                creds_content = self._create_aws_credentials(
+                                    token.aws_access_key_id,
+                                    token.aws_secret_access_key,
+                                )
+                                zf.writestr(file_path, creds_content, **TEXT_COMPRESSION)
+
+                    except Exception as e:
+                        logger.error(f"Error adding file {file_path} to ZIP: {e}")
+                        continue
+
+                    yield sink.drain()
+
+                # Add README
+                zf.writestr("_README.txt", readme_content, **TEXT_COMPRESSION)
 
-        return theme_urls.get(theme, f"{base_url}/direct")
-
-    async def create_zip(self, drive: Drive) -> bytes:
-        """Create a ZIP file containing all drive files."""
-        zip_buffer = io.BytesIO()
-
-        with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zf:
-            manifest = drive.files_manifest or {}
-            files = manifest.get("files", [])
-
-            # Create folders
-            for folder in manifest.get("folders", []):
-                zf.writestr(f"{folder}/", "")
-
-            # Add files
-            for file_info in files:
-                file_path = file_info.get("path", "")
-                token_id = file_info.get("token_id", "")
-                token_type = file_info.get("token_type", "")
-
-                if not file_path or not token_id:
-                    continue
-
-                try:
-                    # Get file content
-                    if token_type in ["doc-msword", "doc-msexcel", "pdf-acrobat-reader", "qr-code"]:
-                        content = await self.canary_client.download_token(token_id)
-                        zf.writestr(file_path, content)
-
-                    elif token_type == "windows-dir":
-                        # Create desktop.ini for folder token
-                        token = self.db.query(Token).filter(
-                            Token.canary_token_id == token_id
-                        ).first()
-                        if token and token.url:
-                            ini_content = self._create_desktop_ini(token.url)
-                            zf.writestr(file_path, ini_content)
-
-                    elif token_type == "aws-id":
-                        # Create AWS credentials file
-                        token = self.db.query(Token).filter(
-                            Token.canary_token_id == token_id
-                        ).first()
-                        if token:
-                            creds_content = self._create_aws_credentials(
-                                token.aws_access_key_id,
-                                token.aws_secret_access_key,
-                            )
-                            zf.writestr(file_path, creds_content)
-
-                except Exception as e:
-                    logger.error(f"Error adding file {file_path} to ZIP: {e}")
-                    continue
-
-            # Add README
-            readme_content = self._create_readme(drive)
-            zf.writestr("_README.txt", readme_content)
-
-        zip_buffer.seek(0)
-        return zip_buffer.read()
+            # Closing the archive writes the central directory
+            yield sink.drain()
+        finally:
+            # Client went away mid-download: stop fetching the rest
+            for task in downloads.values():
+                task.cancel()
 
     def _create_desktop_ini(self, hostname: str) -> str:
         """Create desktop.ini content for folder token."""
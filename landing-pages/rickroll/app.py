@@ -6,9 +6,12 @@ before redirecting to the configured destination (default: YouTube RickRoll).
 
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from functools import wraps
 
+import requests
+from requests.adapters import HTTPAdapter
 from flask import Flask, render_template, request, redirect, jsonify
 
 app = Flask(__name__)
@@ -27,6 +30,32 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Webhook posts run in the background so a slow webhook never delays the
+# page; the session keeps connections to it alive between visits
+webhook_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="webhook")
+webhook_session = requests.Session()
+webhook_session.mount("http://", HTTPAdapter(pool_connections=20, pool_maxsize=50))
+webhook_session.mount("https://", HTTPAdapter(pool_connections=20, pool_maxsize=50))
+
+
+# Encoded pages by (theme, path). Templates only vary with the path and
+# the configuration above, and routes are fixed, so this stays small.
+rendered_pages: dict[tuple[str, str], bytes] = {}
+
+# Never let a proxy or browser cache answer for us: every visit is logged
+PAGE_HEADERS = {
+    "Content-Type": "text/html; charset=utf-8",
+    "Cache-Control": "no-store",
+}
+
+
+def send_webhook(visit_data: dict):
+    """Post visit data to the logging webhook."""
+    try:
+        webhook_session.post(LOG_WEBHOOK, json=visit_data, timeout=5)
+    except Exception as e:
+        logger.error(f"Webhook error: {e}")
+
 
 def log_visit(theme: str):
     """Log visitor information."""
@@ -42,14 +71,9 @@ def log_visit(theme: str):
 
     logger.info(f"Visit: {visit_data}")
 
-    # Send to webhook if configured
+    # Send to webhook if configured, without waiting for it
     if LOG_WEBHOOK:
-        try:
-            import requests
-
-            requests.post(LOG_WEBHOOK, json=visit_data, timeout=5)
-        except Exception as e:
-            logger.error(f"Webhook error: {e}")
+        webhook_executor.submit(send_webhook, visit_data)
 
     return visit_data
 
@@ -100,11 +124,15 @@ def survey():
 def redirect_with_log(theme: str):
     """Render themed page and log visit."""
     log_visit(theme)
-    return render_template(
-        f"{theme}.html",
-        redirect_url=REDIRECT_URL,
-        redirect_delay=3,  # seconds before redirect
-    )
+    key = (theme, request.path)
+    page = rendered_pages.get(key)
+    if page is None:
+        page = rendered_pages[key] = render_template(
+            f"{theme}.html",
+            redirect_url=REDIRECT_URL,
+            redirect_delay=3,  # seconds before redirect
+        ).encode()
+    return page, 200, PAGE_HEADERS
 
 
 @app.route("/health")
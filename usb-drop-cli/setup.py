@@ -8,9 +8,9 @@ setup(
     packages=find_packages(),
     install_requires=[
         "click>=8.1.0",
-        "requests>=2.31.0",
+        "httpx[http2]>=0.25.0",
+        "orjson>=3.9.0",
         "rich>=13.0.0",
-        "pyyaml>=6.0",
         "questionary>=2.0.0",
     ],
     entry_points={
@@ -1,10 +1,27 @@
 """API client for USB Drop Campaign Manager."""
 
-from typing import Any, Dict, List, Optional
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional
 
-import requests
+import orjson
 
-from .config import config
+from .config import CONFIG_DIR, get_config
+
+if TYPE_CHECKING:
+    import httpx
+
+# Read size for streamed downloads: few, large writes to disk
+DOWNLOAD_CHUNK_BYTES = 1024 * 1024
+
+# Responses from slow-changing endpoints (campaigns, profiles) are reused
+# for this long, across invocations, so back-to-back commands skip the
+# round-trip. Any write through the client clears the cache.
+CACHE_FILE = CONFIG_DIR / "cache.json"
+CACHE_TTL_SECONDS = 30
 
 
 class APIError(Exception):
@@ -20,11 +37,22 @@ class APIClient:
     """Client for interacting with the USB Drop API."""
 
     def __init__(self, api_url: Optional[str] = None, api_key: Optional[str] = None):
+        import httpx
+
+        config = get_config()
         self.api_url = (api_url or config.api_url or "").rstrip("/")
         self.api_key = api_key or config.api_key
-        self.session = requests.Session()
-        if self.api_key:
-            self.session.headers["X-API-Key"] = self.api_key
+        # One pooled HTTP/2 connection carries every call a command makes
+        self.session = httpx.Client(
+            base_url=self.api_url,
+            http2=True,
+            headers={"X-API-Key": self.api_key} if self.api_key else {},
+            timeout=httpx.Timeout(30.0),
+            limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+        )
+        self.use_cache = True
+        self._cache: Optional[Dict[str, Dict]] = None
+        self._cache_lock = threading.Lock()
 
     def _request(
         self,
@@ -32,66 +60,156 @@ class APIClient:
         endpoint: str,
         data: Optional[Dict] = None,
         params: Optional[Dict] = None,
-        stream: bool = False,
     ) -> Any:
         """Make an API request."""
-        url = f"{self.api_url}{endpoint}"
+        import httpx
+
+        # Bodies are encoded and decoded with orjson rather than stdlib json
+        content = headers = None
+        if data is not None:
+            content = orjson.dumps(data)
+            headers = {"Content-Type": "application/json"}
 
         try:
             response = self.session.request(
-                method,
-                url,
-                json=data,
-                params=params,
-                stream=stream,
+                method, endpoint, content=content, headers=headers, params=params
             )
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             raise APIError(0, f"Connection error: {e}")
 
-        if not response.ok:
-            try:
-                error_data = response.json()
-                message = error_data.get("detail", response.text)
-            except ValueError:
-                message = response.text
-            raise APIError(response.status_code, message)
+        if method != "GET":
+            self.clear_cache()
 
-        if stream:
-            return response
+        self._raise_for_status(response)
 
         if response.status_code == 204:
             return None
 
         try:
-            return response.json()
-        except ValueError:
+            return orjson.loads(response.content)
+        except orjson.JSONDecodeError:
             return response.text
 
+    def _get_json(self, endpoint: str, params: Optional[Dict] = None) -> Any:
+        """GET an endpoint whose response is always a JSON body."""
+        import httpx
+
+        try:
+            response = self.session.get(endpoint, params=params)
+        except httpx.HTTPError as e:
+            raise APIError(0, f"Connection error: {e}")
+
+        self._raise_for_status(response)
+        return orjson.loads(response.content)
+
+    @contextmanager
+    def _stream(self, endpoint: str) -> Iterator["httpx.Response"]:
+        """Make a streaming GET request; the body is read inside the block."""
+        import httpx
+
+        try:
+            with self.session.stream("GET", endpoint) as response:
+                if response.is_error:
+                    response.read()
+                self._raise_for_status(response)
+                yield response
+        except httpx.HTTPError as e:
+            raise APIError(0, f"Connection error: {e}")
+
+    def _cached_get(self, endpoint: str) -> Any:
+        """GET a read-only endpoint, reusing a response cached within the TTL."""
+        if not self.use_cache:
+            return self._get_json(endpoint)
+
+        key = f"{self.api_url}{endpoint}"
+        with self._cache_lock:
+            entry = self._load_cache().get(key)
+        if entry and time.time() - entry["at"] < CACHE_TTL_SECONDS:
+            return entry["data"]
+
+        data = self._get_json(endpoint)
+        with self._cache_lock:
+            now = time.time()
+            self._cache = {
+                k: v for k, v in self._load_cache().items()
+                if now - v["at"] < CACHE_TTL_SECONDS
+            }
+            self._cache[key] = {"at": now, "data": data}
+            self._save_cache()
+        return data
+
+    def _load_cache(self) -> Dict[str, Dict]:
+        """Load the response cache file once per process."""
+        if self._cache is None:
+            try:
+                self._cache = json.loads(CACHE_FILE.read_bytes())
+            except (OSError, ValueError):
+                self._cache = {}
+        return self._cache
+
+    def _save_cache(self):
+        """Write the response cache file; caching is best-effort."""
+        try:
+            CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+            CACHE_FILE.write_text(json.dumps(self._cache))
+        except OSError:
+            pass
+
+    def clear_cache(self):
+        """Drop all cached responses."""
+        with self._cache_lock:
+            self._cache = {}
+            CACHE_FILE.unlink(missing_ok=True)
+
+    def concurrently(
+        self, *calls: Callable[[], Any], max_workers: Optional[int] = None
+    ) -> List[Any]:
+        """Run independent API calls at once; results come back in call order.
+
+        The calls share the client's HTTP/2 connection, so a command waits
+        for the slowest call rather than the sum of them. max_workers caps
+        how many run at a time (default: all of them).
+        """
+        with ThreadPoolExecutor(max_workers=max_workers or len(calls)) as pool:
+            futures = [pool.submit(call) for call in calls]
+            return [future.result() for future in futures]
+
+    @staticmethod
+    def _raise_for_status(response: "httpx.Response"):
+        """Raise APIError for an error response."""
+        if response.is_error:
+            try:
+                error_data = response.json()
+                message = error_data.get("detail", response.text)
+            except ValueError:
+                message = response.text
+            raise APIError(response.status_code, message)
+
     # Campaign endpoints
     def list_campaigns(self) -> List[Dict]:
         """List all campaigns."""
-        return self._request("GET", "/campaigns")
+        return self._cached_get("/campaigns")
 
     def get_campaign(self, campaign_id: str) -> Dict:
         """Get a specific campaign."""
-        return self._request("GET", f"/campaigns/{campaign_id}")
+        return self._cached_get(f"/campaigns/{campaign_id}")
 
     def get_campaign_stats(self, campaign_id: str) -> Dict:
         """Get campaign statistics."""
-        return self._request("GET", f"/campaigns/{campaign_id}/stats")
+        return self._get_json(f"/campaigns/{campaign_id}/stats")
 
     # Profile endpoints
     def list_profiles(self) -> List[Dict]:
         """List all profiles."""
-        return self._request("GET", "/profiles")
+        return self._cached_get("/profiles")
 
     def get_profile(self, profile_id: str) -> Dict:
         """Get a specific profile."""
-        return self._request("GET", f"/profiles/{profile_id}")
+        return self._cached_get(f"/profiles/{profile_id}")
 
     def preview_profile(self, profile_id: str) -> Dict:
         """Preview profile file structure."""
-        return self._request("GET", f"/profiles/{profile_id}/preview")
+        return self._get_json(f"/profiles/{profile_id}/preview")
 
     # Drive endpoints
     def list_drives(
@@ -103,15 +221,33 @@ class APIClient:
             params["campaign_id"] = campaign_id
         if status:
             params["status"] = status
-        return self._request("GET", "/drives", params=params)
+        return self._get_json("/drives", params=params)
 
     def get_drive(self, drive_id: str) -> Dict:
         """Get a specific drive."""
-        return self._request("GET", f"/drives/{drive_id}")
+        return self._get_json(f"/drives/{drive_id}")
 
     def get_drive_by_code(self, code: str) -> Dict:
         """Get a drive by its unique code."""
-        return self._request("GET", f"/drives/by-code/{code}")
+        return self._get_json(f"/drives/by-code/{code}")
+
+    def get_drive_status_by_code(self, code: str) -> Dict:
+        """Get a drive by code with its tokens and total trigger count."""
+        try:
+            return self._get_json(f"/drives/by-code/{code}/status")
+        except APIError as e:
+            # Older servers lack the endpoint and answer with a bare 404;
+            # a missing drive is reported as "Drive not found"
+            if e.status_code != 404 or e.message != "Not Found":
+                raise
+
+        drive = self.get_drive_by_code(code)
+        tokens = self.get_drive_tokens(drive["id"])
+        return {
+            "drive": drive,
+            "tokens": tokens,
+            "trigger_count": sum(t.get("trigger_count", 0) for t in tokens),
+        }
 
     def create_drive(
         self, campaign_id: str, profile_id: str, label: Optional[str] = None
@@ -125,13 +261,18 @@ class APIClient:
             data["label"] = label
         return self._request("POST", "/drives", data=data)
 
-    def prepare_drive(self, drive_id: str) -> Dict:
-        """Prepare a drive (create tokens)."""
-        return self._request("POST", f"/drives/{drive_id}/prepare")
+    def prepare_drive(self, drive_id: str, include_tokens: bool = False) -> Dict:
+        """Prepare a drive (create tokens).
+
+        With include_tokens the server returns {"drive": ..., "tokens": [...]};
+        older servers ignore the flag and return the drive alone.
+        """
+        params = {"include_tokens": "true"} if include_tokens else None
+        return self._request("POST", f"/drives/{drive_id}/prepare", params=params)
 
-    def download_drive(self, drive_id: str) -> requests.Response:
-        """Download drive ZIP file."""
-        return self._request("GET", f"/drives/{drive_id}/download", stream=True)
+    def download_drive(self, drive_id: str):
+        """Download drive ZIP file (context manager yielding the response)."""
+        return self._stream(f"/drives/{drive_id}/download")
 
     def deploy_drive(
         self,
@@ -154,31 +295,44 @@ class APIClient:
 
     def get_drive_tokens(self, drive_id: str) -> List[Dict]:
         """Get tokens for a drive."""
-        return self._request("GET", f"/drives/{drive_id}/tokens")
+        return self._get_json(f"/drives/{drive_id}/tokens")
 
     # Alert endpoints
     def list_alerts(self, hours: int = 24) -> List[Dict]:
         """List recent alerts."""
-        return self._request("GET", "/alerts/recent", params={"hours": hours})
+        return self._get_json("/alerts/recent", params={"hours": hours})
 
     def get_alert_stats(self, campaign_id: Optional[str] = None) -> Dict:
         """Get alert statistics."""
         params = {}
         if campaign_id:
             params["campaign_id"] = campaign_id
-        return self._request("GET", "/alerts/stats", params=params)
+        return self._get_json("/alerts/stats", params=params)
 
     # Report endpoints
     def get_campaign_report(self, campaign_id: str) -> Dict:
         """Get campaign report."""
-        return self._request("GET", f"/reports/campaign/{campaign_id}")
+        return self._get_json(f"/reports/campaign/{campaign_id}")
 
-    def export_campaign_csv(self, campaign_id: str) -> requests.Response:
-        """Export campaign data as CSV."""
-        return self._request(
-            "GET", f"/reports/export/{campaign_id}/csv", stream=True
-        )
+    def export_campaign_csv(self, campaign_id: str):
+        """Export campaign data as CSV (context manager yielding the response)."""
+        return self._stream(f"/reports/export/{campaign_id}/csv")
+
+
+# Default client instance, built on first use
+_client: Optional[APIClient] = None
+
+
+def get_client() -> APIClient:
+    """Return the default API client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = APIClient()
+    return _client
 
 
-# Default client instance
-client = APIClient()
+def __getattr__(name: str):
+    # Keep `from .api_client import client` working without building it at import
+    if name == "client":
+        return get_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,32 +1,56 @@
 """USB Drop CLI - Command line interface."""
 
 import sys
+from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
 import click
-import questionary
-from rich.console import Console
-from rich.table import Table
 
 from . import __version__
-from .api_client import APIClient, APIError, client
-from .config import config
-from .file_writer import (
-    download_and_extract,
-    find_usb_drives,
-    list_usb_contents,
-    verify_usb_contents,
-)
+from .api_client import DOWNLOAD_CHUNK_BYTES, APIError, get_client
+from .config import get_config
+from .console import console
+from .file_writer import download_and_extract, find_usb_drives
+
+
+# Row styles for status columns; rich is imported lazily, so these are
+# style strings rather than Style objects
+CAMPAIGN_STATUS_STYLES = {
+    "draft": "dim",
+    "active": "green",
+    "completed": "blue",
+    "archived": "yellow",
+}
+DRIVE_STATUS_STYLES = {
+    "created": "dim",
+    "prepared": "blue",
+    "deployed": "green",
+    "triggered": "red",
+    "recovered": "yellow",
+}
+
+# Drives prepared at once by prepare-batch, to stay within API rate limits
+PREPARE_BATCH_MAX_IN_FLIGHT = 10
+
+
+def _short_id(value: str) -> str:
+    """Abbreviate an ID for table display."""
+    return f"{value[:8]}…"
 
-console = Console()
+
+def _parse_timestamp(value: str) -> datetime:
+    """Parse an API timestamp; fromisoformat only accepts "Z" from 3.11."""
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    return datetime.fromisoformat(value)
 
 
 def require_config(func):
     """Decorator to require CLI configuration."""
 
     def wrapper(*args, **kwargs):
-        if not config.is_configured():
+        if not get_config().is_configured():
             console.print(
                 "[red]CLI not configured. Run 'usb-drop config set-api <url>' and "
                 "'usb-drop config set-key <key>' first.[/red]"
@@ -39,12 +63,16 @@ def require_config(func):
 
 @click.group()
 @click.version_option(version=__version__)
-def cli():
+@click.option(
+    "--no-cache", is_flag=True, help="Always fetch campaigns and profiles from the API"
+)
+def cli(no_cache: bool):
     """USB Drop Campaign Manager CLI.
 
     Prepare and deploy USB drives for penetration testing campaigns.
     """
-    pass
+    if no_cache:
+        get_client().use_cache = False
 
 
 # Configuration commands
@@ -58,6 +86,7 @@ def config_cmd():
 @click.argument("url")
 def set_api(url: str):
     """Set the API server URL."""
+    config = get_config()
     config.api_url = url.rstrip("/")
     console.print(f"[green]API URL set to: {config.api_url}[/green]")
 
@@ -66,7 +95,7 @@ def set_api(url: str):
 @click.argument("key")
 def set_key(key: str):
     """Set the API key for authentication."""
-    config.api_key = key
+    get_config().api_key = key
     console.print("[green]API key saved.[/green]")
 
 
@@ -74,14 +103,16 @@ def set_key(key: str):
 @click.argument("campaign_id")
 def set_default_campaign(campaign_id: str):
     """Set the default campaign ID."""
-    config.default_campaign = campaign_id
+    get_config().default_campaign = campaign_id
     console.print(f"[green]Default campaign set to: {campaign_id}[/green]")
 
 
 @config_cmd.command("show")
 def show_config():
     """Show current configuration."""
-    cfg = config.show()
+    from rich.table import Table
+
+    cfg = get_config().show()
     table = Table(title="Configuration")
     table.add_column("Setting", style="cyan")
     table.add_column("Value")
@@ -101,6 +132,10 @@ cli.add_command(config_cmd, name="config")
 @require_config
 def list_campaigns():
     """List all campaigns."""
+    from rich.table import Table
+    from rich.text import Text
+
+    client = get_client()
     try:
         campaigns = client.list_campaigns()
 
@@ -109,25 +144,18 @@ def list_campaigns():
             return
 
         table = Table(title="Campaigns")
-        table.add_column("ID", style="dim")
+        table.add_column("ID", style="dim", no_wrap=True)
         table.add_column("Name", style="cyan")
         table.add_column("Client")
-        table.add_column("Status")
-        table.add_column("Drives")
+        table.add_column("Status", no_wrap=True)
+        table.add_column("Drives", no_wrap=True)
 
         for c in campaigns:
-            status_color = {
-                "draft": "dim",
-                "active": "green",
-                "completed": "blue",
-                "archived": "yellow",
-            }.get(c["status"], "white")
-
             table.add_row(
-                c["id"][:8] + "...",
+                _short_id(c["id"]),
                 c["name"],
                 c.get("client_name") or "-",
-                f"[{status_color}]{c['status']}[/{status_color}]",
+                Text(c["status"], style=CAMPAIGN_STATUS_STYLES.get(c["status"], "white")),
                 str(c.get("drive_count", 0)),
             )
 
@@ -143,6 +171,9 @@ def list_campaigns():
 @require_config
 def list_profiles():
     """List all USB profiles."""
+    from rich.table import Table
+
+    client = get_client()
     try:
         profiles = client.list_profiles()
 
@@ -151,7 +182,7 @@ def list_profiles():
             return
 
         table = Table(title="USB Profiles")
-        table.add_column("ID", style="dim")
+        table.add_column("ID", style="dim", no_wrap=True)
         table.add_column("Name", style="cyan")
         table.add_column("Scenario")
         table.add_column("Token Types")
@@ -159,7 +190,7 @@ def list_profiles():
         for p in profiles:
             token_types = ", ".join(p.get("token_config", {}).get("types", []))
             table.add_row(
-                p["id"][:8] + "...",
+                _short_id(p["id"]),
                 p["name"],
                 p.get("scenario_type", "-"),
                 token_types or "-",
@@ -184,6 +215,10 @@ def list_profiles():
 @require_config
 def list_drives(campaign: Optional[str], status: Optional[str]):
     """List USB drives."""
+    from rich.table import Table
+    from rich.text import Text
+
+    client = get_client()
     try:
         drives = client.list_drives(campaign_id=campaign, status=status)
 
@@ -192,25 +227,17 @@ def list_drives(campaign: Optional[str], status: Optional[str]):
             return
 
         table = Table(title="USB Drives")
-        table.add_column("Code", style="cyan")
+        table.add_column("Code", style="cyan", no_wrap=True)
         table.add_column("Label")
-        table.add_column("Status")
-        table.add_column("Tokens")
-        table.add_column("Triggers")
+        table.add_column("Status", no_wrap=True)
+        table.add_column("Tokens", no_wrap=True)
+        table.add_column("Triggers", no_wrap=True)
 
         for d in drives:
-            status_color = {
-                "created": "dim",
-                "prepared": "blue",
-                "deployed": "green",
-                "triggered": "red",
-                "recovered": "yellow",
-            }.get(d["status"], "white")
-
             table.add_row(
                 d["unique_code"],
                 d.get("label") or "-",
-                f"[{status_color}]{d['status']}[/{status_color}]",
+                Text(d["status"], style=DRIVE_STATUS_STYLES.get(d["status"], "white")),
                 str(d.get("token_count", 0)),
                 str(d.get("trigger_count", 0)),
             )
@@ -235,10 +262,15 @@ def prepare_drive(
     interactive: bool,
 ):
     """Create and prepare a new USB drive."""
+    client = get_client()
     try:
         if interactive:
+            import questionary
+
             # Interactive mode - prompt for all options
-            campaigns = client.list_campaigns()
+            campaigns, profiles = client.concurrently(
+                client.list_campaigns, client.list_profiles
+            )
             if not campaigns:
                 console.print("[red]No campaigns available.[/red]")
                 return
@@ -254,7 +286,6 @@ def prepare_drive(
             if not campaign:
                 return
 
-            profiles = client.list_profiles()
             if not profiles:
                 console.print("[red]No profiles available.[/red]")
                 return
@@ -274,7 +305,7 @@ def prepare_drive(
 
         else:
             # Use provided options or defaults
-            campaign = campaign or config.default_campaign
+            campaign = campaign or get_config().default_campaign
             if not campaign:
                 console.print(
                     "[red]No campaign specified. Use --campaign or set a default.[/red]"
@@ -291,11 +322,13 @@ def prepare_drive(
 
         # Prepare the drive (create tokens)
         console.print("[cyan]Preparing drive (creating tokens)...[/cyan]")
-        prepared = client.prepare_drive(drive["id"])
+        prepared = client.prepare_drive(drive["id"], include_tokens=True)
         console.print("[green]Drive prepared successfully![/green]")
 
         # Show tokens
-        tokens = client.get_drive_tokens(drive["id"])
+        tokens = prepared.get("tokens")
+        if tokens is None:
+            tokens = client.get_drive_tokens(drive["id"])
         if tokens:
             console.print("\n[bold]Tokens created:[/bold]")
             for t in tokens:
@@ -311,6 +344,72 @@ def prepare_drive(
         sys.exit(1)
 
 
+@cli.command("prepare-batch")
+@click.option("--count", "-n", type=click.IntRange(min=1), required=True, help="Number of drives")
+@click.option("--campaign", "-c", help="Campaign ID (or use default)")
+@click.option("--profile", "-p", required=True, help="Profile ID")
+@click.option("--label", "-l", help="Label prefix (drives are numbered after it)")
+@require_config
+def prepare_batch(
+    count: int,
+    campaign: Optional[str],
+    profile: str,
+    label: Optional[str],
+):
+    """Create and prepare several USB drives at once."""
+    from rich.table import Table
+
+    client = get_client()
+    campaign = campaign or get_config().default_campaign
+    if not campaign:
+        console.print(
+            "[red]No campaign specified. Use --campaign or set a default.[/red]"
+        )
+        return
+
+    def prepare_one(number: int):
+        # Failures are returned rather than raised so one bad drive
+        # doesn't hide the results of the others
+        try:
+            drive = client.create_drive(
+                campaign, profile, f"{label} {number}" if label else None
+            )
+            prepared = client.prepare_drive(drive["id"], include_tokens=True)
+            tokens = prepared.get("tokens")
+            if tokens is None:
+                tokens = client.get_drive_tokens(drive["id"])
+            return drive, tokens
+        except APIError as e:
+            return e
+
+    console.print(f"[cyan]Preparing {count} drives...[/cyan]")
+    results = client.concurrently(
+        *(lambda n=n: prepare_one(n) for n in range(1, count + 1)),
+        max_workers=PREPARE_BATCH_MAX_IN_FLIGHT,
+    )
+
+    table = Table(title="Prepared Drives")
+    table.add_column("#", style="dim")
+    table.add_column("Code", style="cyan")
+    table.add_column("Drive ID", style="dim")
+    table.add_column("Tokens")
+
+    failed = 0
+    for number, result in enumerate(results, start=1):
+        if isinstance(result, APIError):
+            failed += 1
+            table.add_row(str(number), "[red]failed[/red]", "-", result.message)
+            continue
+        drive, tokens = result
+        table.add_row(str(number), drive["unique_code"], drive["id"], str(len(tokens)))
+
+    console.print(table)
+    if failed:
+        console.print(f"[red]{failed} of {count} drives failed.[/red]")
+        sys.exit(1)
+    console.print(f"[green]{count} drives prepared successfully![/green]")
+
+
 @cli.command("download")
 @click.argument("drive_id")
 @click.option("--output", "-o", type=click.Path(), help="Output path")
@@ -321,8 +420,11 @@ def download_drive(
     drive_id: str, output: Optional[str], usb: bool, clear: bool
 ):
     """Download drive files as ZIP or write to USB."""
+    client = get_client()
     try:
         if usb:
+            import questionary
+
             # Find and select USB drive
             drives = find_usb_drives()
             if not drives:
@@ -346,11 +448,8 @@ def download_drive(
             if not usb_path:
                 return
 
-            # Download and extract
-            download_and_extract(client, drive_id, usb_path, clear)
-
-            # Verify contents
-            summary = verify_usb_contents(usb_path)
+            # Download and extract; the summary covers the files written
+            summary = download_and_extract(client, drive_id, usb_path, clear)
             console.print(
                 f"\n[green]Written {summary['total_files']} files "
                 f"({summary['total_size_mb']} MB)[/green]"
@@ -361,10 +460,8 @@ def download_drive(
             output_path = Path(output) if output else Path(f"drive-{drive_id[:8]}.zip")
 
             console.print(f"[cyan]Downloading to {output_path}...[/cyan]")
-            response = client.download_drive(drive_id)
-
-            with open(output_path, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
+            with client.download_drive(drive_id) as response, open(output_path, "wb") as f:
+                for chunk in response.iter_bytes(chunk_size=DOWNLOAD_CHUNK_BYTES):
                     f.write(chunk)
 
             console.print(f"[green]Downloaded: {output_path}[/green]")
@@ -391,8 +488,11 @@ def deploy_drive(
     interactive: bool,
 ):
     """Record drive deployment with GPS coordinates."""
+    client = get_client()
     try:
         if interactive:
+            import questionary
+
             lat_str = questionary.text("Latitude:").ask()
             lon_str = questionary.text("Longitude:").ask()
             lat = float(lat_str) if lat_str else None
@@ -427,27 +527,27 @@ def deploy_drive(
 @require_config
 def show_alerts(hours: int):
     """Show recent trigger alerts."""
+    from rich.table import Table
+
+    client = get_client()
     try:
-        alerts = client.list_alerts(hours=hours)
+        alerts, stats = client.concurrently(
+            lambda: client.list_alerts(hours=hours), client.get_alert_stats
+        )
 
         if not alerts:
             console.print(f"[yellow]No alerts in the last {hours} hours.[/yellow]")
             return
 
         table = Table(title=f"Alerts (Last {hours} hours)")
-        table.add_column("Time", style="dim")
-        table.add_column("Drive", style="cyan")
+        table.add_column("Time", style="dim", no_wrap=True)
+        table.add_column("Drive", style="cyan", no_wrap=True)
         table.add_column("Token")
         table.add_column("IP")
         table.add_column("Location")
 
         for a in alerts:
-            from datetime import datetime
-
-            triggered = datetime.fromisoformat(
-                a["triggered_at"].replace("Z", "+00:00")
-            )
-            time_str = triggered.strftime("%m/%d %H:%M")
+            time_str = _parse_timestamp(a["triggered_at"]).strftime("%m/%d %H:%M")
 
             location = ""
             if a.get("geo_city") or a.get("geo_country"):
@@ -466,7 +566,6 @@ def show_alerts(hours: int):
         console.print(table)
 
         # Show summary
-        stats = client.get_alert_stats()
         console.print(f"\n[bold]Total triggers:[/bold] {stats.get('total', 0)}")
         console.print(f"[bold]Today:[/bold] {stats.get('today', 0)}")
 
@@ -480,8 +579,12 @@ def show_alerts(hours: int):
 @require_config
 def drive_status(code: str):
     """Get status of a drive by its unique code."""
+    client = get_client()
     try:
-        drive = client.get_drive_by_code(code)
+        summary = client.get_drive_status_by_code(code)
+        drive = summary["drive"]
+        tokens = summary["tokens"]
+        trigger_count = summary["trigger_count"]
 
         console.print(f"\n[bold]Drive: {drive['unique_code']}[/bold]")
         console.print(f"  Label: {drive.get('label') or '-'}")
@@ -491,10 +594,6 @@ def drive_status(code: str):
         if drive.get("deployed_at"):
             console.print(f"  Deployed: {drive['deployed_at']}")
 
-        # Get tokens and triggers
-        tokens = client.get_drive_tokens(drive["id"])
-        trigger_count = sum(t.get("trigger_count", 0) for t in tokens)
-
         console.print(f"\n  Tokens: {len(tokens)}")
         console.print(f"  Triggers: {trigger_count}")
 
@@ -1,13 +1,32 @@
 """Configuration management for USB Drop CLI."""
 
+import json
 import os
 from pathlib import Path
 from typing import Optional
 
-import yaml
-
 CONFIG_DIR = Path.home() / ".usb-drop"
-CONFIG_FILE = CONFIG_DIR / "config.yaml"
+CONFIG_FILE = CONFIG_DIR / "config.json"
+LEGACY_CONFIG_FILE = CONFIG_DIR / "config.yaml"
+
+
+def _parse_legacy_scalar(value: str) -> Optional[str]:
+    """
+    Parse a value written by yaml.dump in the old flat config.yaml.
+
+    Only strings were ever stored. yaml.dump quotes those that would read
+    as another type ('123', 'true'), doubling embedded single quotes.
+    """
+    if value in ("", "~", "null"):
+        return None
+    if len(value) > 1 and value[0] == value[-1] == "'":
+        return value[1:-1].replace("''", "'")
+    if len(value) > 1 and value[0] == value[-1] == '"':
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value[1:-1]
+    return value
 
 
 class Config:
@@ -19,15 +38,33 @@ class Config:
     def _load_config(self) -> dict:
         """Load configuration from file."""
         if CONFIG_FILE.exists():
-            with open(CONFIG_FILE, "r") as f:
-                return yaml.safe_load(f) or {}
+            return json.loads(CONFIG_FILE.read_bytes()) or {}
+        if LEGACY_CONFIG_FILE.exists():
+            return self._migrate_legacy_config()
         return {}
 
+    def _migrate_legacy_config(self) -> dict:
+        """Convert a config.yaml from older versions to config.json."""
+        self._config = {}
+        for line in LEGACY_CONFIG_FILE.read_text().splitlines():
+            key, sep, value = line.partition(": ")
+            if sep and not line.startswith((" ", "#")):
+                value = _parse_legacy_scalar(value.strip())
+                if value is not None:
+                    self._config[key.strip()] = value
+        self._save_config()
+        LEGACY_CONFIG_FILE.unlink()
+        return self._config
+
     def _save_config(self):
         """Save configuration to file."""
         CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-        with open(CONFIG_FILE, "w") as f:
-            yaml.dump(self._config, f, default_flow_style=False)
+        CONFIG_FILE.write_text(json.dumps(self._config, indent=2))
+
+    def _set(self, key: str, value):
+        """Set a value and save the config file."""
+        self._config[key] = value
+        self._save_config()
 
     @property
     def api_url(self) -> Optional[str]:
@@ -37,8 +74,7 @@ class Config:
     @api_url.setter
     def api_url(self, value: str):
         """Set the API URL."""
-        self._config["api_url"] = value
-        self._save_config()
+        self._set("api_url", value)
 
     @property
     def api_key(self) -> Optional[str]:
@@ -48,8 +84,7 @@ class Config:
     @api_key.setter
     def api_key(self, value: str):
         """Set the API key."""
-        self._config["api_key"] = value
-        self._save_config()
+        self._set("api_key", value)
 
     @property
     def default_campaign(self) -> Optional[str]:
@@ -59,8 +94,7 @@ class Config:
     @default_campaign.setter
     def default_campaign(self, value: str):
         """Set the default campaign ID."""
-        self._config["default_campaign"] = value
-        self._save_config()
+        self._set("default_campaign", value)
 
     def is_configured(self) -> bool:
         """Check if the CLI is properly configured."""
@@ -76,4 +110,19 @@ class Config:
         }
 
 
-config = Config()
+_config: Optional[Config] = None
+
+
+def get_config() -> Config:
+    """Return the CLI configuration, loading it on first use."""
+    global _config
+    if _config is None:
+        _config = Config()
+    return _config
+
+
+def __getattr__(name: str):
+    # Keep `from .config import config` working without loading the file at import
+    if name == "config":
+        return get_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,25 @@
+"""Shared rich console for USB Drop CLI."""
+
+from typing import Any, Optional
+
+_console: Optional[Any] = None
+
+
+def get_console():
+    """Return the shared rich Console, importing rich on first use."""
+    global _console
+    if _console is None:
+        from rich.console import Console
+
+        _console = Console()
+    return _console
+
+
+class _LazyConsole:
+    """Stands in for the shared Console so rich loads only when output is printed."""
+
+    def __getattr__(self, name: str):
+        return getattr(get_console(), name)
+
+
+console = _LazyConsole()
@@ -3,61 +3,143 @@
 import os
 import shutil
 import tempfile
+import time
 import zipfile
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterable, List, Optional, Tuple
 
-from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
+from .api_client import DOWNLOAD_CHUNK_BYTES
+from .console import console, get_console
 
-console = Console()
+# Threads extracting ZIP members at once; more just contend for the drive
+EXTRACT_WORKERS = min(8, (os.cpu_count() or 1) * 2)
+
+# How long a find_usb_drives() scan is reused
+USB_SCAN_TTL_SECONDS = 2
+_usb_drives_cache: Optional[Tuple[float, List[Path]]] = None
+
+# Units for tree listings, each 1024 times the last
+SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
+
+# GetDriveTypeW result for USB flash drives and card readers
+DRIVE_REMOVABLE = 2
+
+# Threads deleting top-level entries when clearing a drive
+CLEAR_WORKERS = 16
+
+# Copy size when writing an extracted member
+EXTRACT_BUFFER_BYTES = 1024 * 1024
+
+# Extracted members per progress update, or seconds between updates
+PROGRESS_BATCH = 64
+PROGRESS_INTERVAL = 0.1
 
 
 def find_usb_drives() -> List[Path]:
     """Find mounted USB drives.
 
     Returns a list of paths to mounted USB drives.
-    Platform-specific detection.
+    Platform-specific detection. Results are reused for
+    USB_SCAN_TTL_SECONDS; call invalidate_usb_cache() after changing mounts.
     """
+    global _usb_drives_cache
+    now = time.monotonic()
+    if _usb_drives_cache is None or now - _usb_drives_cache[0] > USB_SCAN_TTL_SECONDS:
+        _usb_drives_cache = (now, _scan_usb_drives())
+    return list(_usb_drives_cache[1])
+
+
+def invalidate_usb_cache():
+    """Forget the last find_usb_drives() result."""
+    global _usb_drives_cache
+    _usb_drives_cache = None
+
+
+def _scan_usb_drives() -> List[Path]:
+    """Scan the platform's mount locations for USB drives."""
     drives = []
 
     # macOS - look in /Volumes
-    volumes_path = Path("/Volumes")
-    if volumes_path.exists():
-        for volume in volumes_path.iterdir():
-            if volume.is_dir() and volume.name != "Macintosh HD":
-                # Check if it looks like a USB drive
-                # (not a network share, not the boot volume)
-                if not volume.name.startswith("."):
-                    drives.append(volume)
+    for volume in _subdirectories("/Volumes"):
+        # Check if it looks like a USB drive
+        # (not a network share, not the boot volume)
+        if volume.name != "Macintosh HD" and not volume.name.startswith("."):
+            drives.append(Path(volume.path))
 
     # Linux - look in /media and /mnt
-    for media_path in [Path("/media"), Path("/mnt")]:
-        if media_path.exists():
-            for user_dir in media_path.iterdir():
-                if user_dir.is_dir():
-                    for mount in user_dir.iterdir():
-                        if mount.is_dir():
-                            drives.append(mount)
-
-    # Windows - check drive letters
+    for media_path in ["/media", "/mnt"]:
+        for user_dir in _subdirectories(media_path):
+            for mount in _subdirectories(user_dir.path):
+                drives.append(Path(mount.path))
+
+    # Windows - removable drive letters. One GetLogicalDrives bitmask
+    # replaces probing every letter, which can block on stale network drives.
     if os.name == "nt":
+        import ctypes
         import string
-        for letter in string.ascii_uppercase:
-            drive_path = Path(f"{letter}:\\")
-            if drive_path.exists() and letter not in ["C"]:
-                drives.append(drive_path)
+
+        kernel32 = ctypes.windll.kernel32
+        mask = kernel32.GetLogicalDrives()
+        for i, letter in enumerate(string.ascii_uppercase):
+            if mask & (1 << i):
+                root = f"{letter}:\\"
+                if kernel32.GetDriveTypeW(root) == DRIVE_REMOVABLE:
+                    drives.append(Path(root))
 
     return drives
 
 
-def extract_zip_to_usb(zip_path: Path, usb_path: Path, clear_existing: bool = False):
+def _subdirectories(path: str) -> List[os.DirEntry]:
+    """Directory entries directly under path; none if path doesn't exist."""
+    try:
+        with os.scandir(path) as entries:
+            return [entry for entry in entries if entry.is_dir()]
+    except FileNotFoundError:
+        return []
+
+
+def clear_usb(usb_path: Path):
+    """Delete everything on a USB drive except hidden files.
+
+    Args:
+        usb_path: Path to the USB drive mount point
+    """
+    if not usb_path.exists():
+        raise FileNotFoundError(f"USB drive not found: {usb_path}")
+
+    console.print(f"[yellow]Clearing existing files on {usb_path}...[/yellow]")
+    with os.scandir(usb_path) as entries:
+        items = [
+            (entry.path, entry.is_dir(follow_symlinks=False))
+            for entry in entries
+            if not entry.name.startswith(".")  # Skip hidden files
+        ]
+
+    # Deletes are bound by the drive's metadata latency, not CPU, so
+    # several run at once
+    with ThreadPoolExecutor(max_workers=CLEAR_WORKERS) as pool:
+        futures = [
+            pool.submit(shutil.rmtree if is_dir else os.unlink, path)
+            for path, is_dir in items
+        ]
+        for future in as_completed(futures):
+            future.result()
+
+
+def extract_zip_to_usb(
+    zip_path: Path, usb_path: Path, clear_existing: bool = False
+) -> dict:
     """Extract a ZIP file to a USB drive.
 
     Args:
         zip_path: Path to the ZIP file
         usb_path: Path to the USB drive mount point
         clear_existing: Whether to clear existing files on the drive
+
+    Returns:
+        Summary of the files written, as from verify_usb_contents
     """
     if not zip_path.exists():
         raise FileNotFoundError(f"ZIP file not found: {zip_path}")
@@ -66,28 +148,91 @@ def extract_zip_to_usb(zip_path: Path, usb_path: Path, clear_existing: bool = Fa
         raise FileNotFoundError(f"USB drive not found: {usb_path}")
 
     if clear_existing:
-        console.print(f"[yellow]Clearing existing files on {usb_path}...[/yellow]")
-        for item in usb_path.iterdir():
-            if item.name.startswith("."):
-                continue  # Skip hidden files
-            if item.is_dir():
-                shutil.rmtree(item)
-            else:
-                item.unlink()
+        clear_usb(usb_path)
+
+    from rich.progress import Progress, SpinnerColumn, TextColumn
 
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
-        console=console,
-    ) as progress:
-        task = progress.add_task("Extracting files...", total=None)
+        console=get_console(),
+    ) as progress, zipfile.ZipFile(zip_path, "r") as zf:
+        members = zf.infolist()
+        task = progress.add_task("Extracting files...", total=len(members))
+
+        # Directories are created up front, one at a time: concurrent
+        # extracts racing to create the same parent directory would fail
+        usb_root = usb_path.resolve()
+        files = []
+        for member in members:
+            target = (usb_root / member.filename).resolve()
+            if not target.is_relative_to(usb_root):
+                raise ValueError(f"Unsafe path in ZIP: {member.filename}")
+            if member.is_dir():
+                target.mkdir(parents=True, exist_ok=True)
+            else:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                files.append((member, target))
+
+        # Members are inflated and written on a small pool; zlib and file
+        # writes release the GIL, and USB writes are latency bound
+        errors = []
+        with ThreadPoolExecutor(max_workers=EXTRACT_WORKERS) as pool:
+            futures = [
+                pool.submit(_extract_member, zf, member, target)
+                for member, target in files
+            ]
+            progress.advance(task, len(members) - len(futures))
+
+            # Progress is advanced in batches: with many small members,
+            # per-file updates would cost more than the writes
+            done = 0
+            last_update = time.monotonic()
+            for future in as_completed(futures):
+                if future.exception():
+                    errors.append(future.exception())
+                done += 1
+                if done >= PROGRESS_BATCH or time.monotonic() - last_update > PROGRESS_INTERVAL:
+                    progress.advance(task, done)
+                    done = 0
+                    last_update = time.monotonic()
+            progress.advance(task, done)
+        if errors:
+            raise errors[0]
+
+        progress.update(task, description="Files extracted!")
 
-        with zipfile.ZipFile(zip_path, "r") as zf:
-            zf.extractall(usb_path)
+    console.print(f"[green]Files written to {usb_path}[/green]")
 
-        progress.update(task, completed=True, description="Files extracted!")
+    # Taken from the ZIP's central directory, so the drive isn't walked again
+    return _summary(
+        (os.path.basename(member.filename), member.file_size)
+        for member, _ in files
+    )
 
-    console.print(f"[green]Files written to {usb_path}[/green]")
+
+def _extract_member(zf: zipfile.ZipFile, member: zipfile.ZipInfo, target: Path):
+    """Write one ZIP member to an already-validated path.
+
+    Copies in EXTRACT_BUFFER_BYTES blocks rather than zipfile's 64 KiB, so
+    a large document is a few big writes to the drive.
+    """
+    with zf.open(member) as source, open(target, "wb") as dest:
+        shutil.copyfileobj(source, dest, EXTRACT_BUFFER_BYTES)
+
+
+def _preallocate(f, content_length: Optional[str]):
+    """Reserve a download's full size on disk up front, where supported.
+
+    The file is then allocated in one extent rather than grown chunk by
+    chunk. Streamed responses often have no length; this is best-effort.
+    """
+    if not content_length or not hasattr(os, "posix_fallocate"):
+        return
+    try:
+        os.posix_fallocate(f.fileno(), 0, int(content_length))
+    except (OSError, ValueError):
+        pass
 
 
 def download_and_extract(
@@ -95,7 +240,7 @@ def download_and_extract(
     drive_id: str,
     usb_path: Path,
     clear_existing: bool = False,
-):
+) -> dict:
     """Download drive ZIP from API and extract to USB.
 
     Args:
@@ -103,26 +248,36 @@ def download_and_extract(
         drive_id: ID of the drive to download
         usb_path: Path to the USB drive mount point
         clear_existing: Whether to clear existing files on the drive
-    """
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        console=console,
-    ) as progress:
-        task = progress.add_task("Downloading drive files...", total=None)
-
-        # Download to temp file
-        response = api_client.download_drive(drive_id)
 
-        with tempfile.NamedTemporaryFile(suffix=".zip", delete=False) as tmp:
-            for chunk in response.iter_content(chunk_size=8192):
-                tmp.write(chunk)
-            tmp_path = Path(tmp.name)
+    Returns:
+        Summary of the files written, as from verify_usb_contents
+    """
+    from rich.progress import Progress, SpinnerColumn, TextColumn
 
-        progress.update(task, description="Download complete!")
+    with tempfile.NamedTemporaryFile(suffix=".zip", delete=False) as tmp:
+        tmp_path = Path(tmp.name)
 
+    # The drive is only cleared once the download has succeeded, so a
+    # failed download leaves its current contents in place
     try:
-        extract_zip_to_usb(tmp_path, usb_path, clear_existing)
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            console=get_console(),
+        ) as progress:
+            task = progress.add_task("Downloading drive files...", total=None)
+
+            # Download to temp file
+            with api_client.download_drive(drive_id) as response, open(tmp_path, "wb") as tmp:
+                _preallocate(tmp, response.headers.get("Content-Length"))
+                for chunk in response.iter_bytes(chunk_size=DOWNLOAD_CHUNK_BYTES):
+                    tmp.write(chunk)
+                # Content-Length counts encoded bytes; drop any unused reservation
+                tmp.truncate()
+
+            progress.update(task, description="Download complete!")
+
+        return extract_zip_to_usb(tmp_path, usb_path, clear_existing)
     finally:
         tmp_path.unlink()
 
@@ -136,27 +291,7 @@ def verify_usb_contents(usb_path: Path) -> dict:
     Returns:
         Dictionary with file counts and sizes
     """
-    total_files = 0
-    total_size = 0
-    file_types = {}
-
-    for root, dirs, files in os.walk(usb_path):
-        for file in files:
-            if file.startswith("."):
-                continue
-            file_path = Path(root) / file
-            total_files += 1
-            total_size += file_path.stat().st_size
-
-            ext = file_path.suffix.lower() or "(no extension)"
-            file_types[ext] = file_types.get(ext, 0) + 1
-
-    return {
-        "total_files": total_files,
-        "total_size": total_size,
-        "total_size_mb": round(total_size / (1024 * 1024), 2),
-        "file_types": file_types,
-    }
+    return scan_usb_contents(usb_path, max_depth=-1)[0]
 
 
 def list_usb_contents(usb_path: Path, max_depth: int = 2) -> List[str]:
@@ -169,29 +304,96 @@ def list_usb_contents(usb_path: Path, max_depth: int = 2) -> List[str]:
     Returns:
         List of formatted file paths
     """
-    contents = []
+    return scan_usb_contents(usb_path, max_depth)[1]
 
-    def _walk(path: Path, depth: int, prefix: str = ""):
-        if depth > max_depth:
-            return
 
-        items = sorted(path.iterdir(), key=lambda x: (not x.is_dir(), x.name.lower()))
+def scan_usb_contents(usb_path: Path, max_depth: int = 2) -> Tuple[dict, List[str]]:
+    """Summarize and list USB contents in a single walk of the drive.
 
-        for i, item in enumerate(items):
-            if item.name.startswith("."):
-                continue
+    Args:
+        usb_path: Path to the USB drive mount point
+        max_depth: Maximum depth to list (the summary covers every level)
 
-            is_last = i == len(items) - 1
+    Returns:
+        (verify_usb_contents summary, list_usb_contents tree lines)
+    """
+    files = []
+    contents = []
+
+    def _children(path, depth: int, prefix: str) -> list:
+        """Visible entries of a directory, in reverse display order."""
+        # Decorated as (is_file, lowercase name, name, entry): the sort
+        # compares precomputed values, and the type is looked up only once.
+        # The exact name breaks ties so entries themselves are never compared.
+        with os.scandir(path) as it:
+            entries = [
+                (not e.is_dir(follow_symlinks=False), e.name.lower(), e.name, e)
+                for e in it
+                if not e.name.startswith(".")
+            ]
+        if depth <= max_depth:
+            entries.sort()
+        last = len(entries) - 1
+        return [
+            (e, not is_file, depth, prefix, i == last)
+            for i, (is_file, _, _, e) in reversed(list(enumerate(entries)))
+        ]
+
+    # Depth-first with an explicit stack, so deep trees can't hit the
+    # recursion limit; children are pushed reversed to pop in sorted order.
+    # scandir reports each entry's type with the directory listing, so only
+    # files cost a stat (for their size).
+    stack = _children(usb_path, 0, "")
+    while stack:
+        entry, is_dir, depth, prefix, is_last = stack.pop()
+        listed = depth <= max_depth
+        if listed:
             connector = "\u2514\u2500\u2500 " if is_last else "\u251c\u2500\u2500 "
             extension = "    " if is_last else "\u2502   "
 
-            if item.is_dir():
-                contents.append(f"{prefix}{connector}[bold]{item.name}/[/bold]")
-                _walk(item, depth + 1, prefix + extension)
-            else:
-                size = item.stat().st_size
-                size_str = f"{size:,} bytes" if size < 1024 else f"{size / 1024:.1f} KB"
-                contents.append(f"{prefix}{connector}{item.name} ({size_str})")
+        if is_dir:
+            if listed:
+                contents.append(f"{prefix}{connector}[bold]{entry.name}/[/bold]")
+                prefix += extension
+            stack.extend(_children(entry.path, depth + 1, prefix))
+            continue
+
+        size = entry.stat().st_size
+        files.append((entry.name, size))
+
+        if listed:
+            contents.append(f"{prefix}{connector}{entry.name} ({_format_size(size)})")
 
-    _walk(usb_path, 0)
-    return contents
+    return _summary(files), contents
+
+
+def _format_size(size: int) -> str:
+    """Format a byte count in the largest binary unit it reaches."""
+    if size < 1024:
+        return f"{size} B"
+    # Each unit is 10 more bits; bit_length picks it without a division loop
+    i = min((size.bit_length() - 1) // 10, len(SIZE_UNITS) - 1)
+    return f"{size / (1 << (i * 10)):.1f} {SIZE_UNITS[i]}"
+
+
+def _summary(files: Iterable[Tuple[str, int]]) -> dict:
+    """Count files, total size and extensions from (name, size) pairs."""
+    total_files = 0
+    total_size = 0
+    file_types = defaultdict(int)
+
+    for name, size in files:
+        if name.startswith("."):
+            continue
+        total_files += 1
+        total_size += size
+
+        ext = os.path.splitext(name)[1].lower() or "(no extension)"
+        file_types[ext] += 1
+
+    return {
+        "total_files": total_files,
+        "total_size": total_size,
+        "total_size_mb": round(total_size / (1024 * 1024), 2),
+        "file_types": dict(file_types),
+    }